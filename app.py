@@ -1,80 +1,70 @@
+import json
+import math
+import uuid
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
-import requests
-from io import StringIO
-import re
-
-def get_sample_data():
-    """Create sample data with the provided example"""
-    sample_data = {
-        'prefix': ['Mr.'],
-        'first_name': ['John'],
-        'last_name': ['Doe'],
-        'full_name': ['John Doe'],
-        'email': ['john.doe@example.com'],
-        'timezone': ['America/New_York'],
-        'address_line_1': ['123 Main Street'],
-        'address_line_2': ['Apt 4B'],
-        'city': ['New York'],
-        'state': ['NY'],
-        'postal_code': ['10001'],
-        'country': ['United States'],
-        'ip': ['192.168.1.1'],
-        'phone': ['+1-555-123-4567'],
-        'source': ['n8n_workflow'],
-        'date_of_birth': ['1990-05-15'],
-        'company_id': ['123'],
-        'disc_profile': ['D'],
-        'disc_sales': ['High Performer'],
-        'disc_communication': ['Direct and Brief'],
-        'leadership_style': ['Transformational'],
-        'team_dynamics': ['Collaborative'],
-        'conflict_resolution': ['Mediation-Oriented'],
-        'customer_service_approach': ['Empathetic Listening'],
-        'decision_making_style': ['Data-Driven'],
-        'workplace_behavior': ['Proactive and Detail-Oriented'],
-        'hiring_and_recruitment': ['Culture-First'],
-        'coaching_and_development': ['Growth Mindset Focused'],
-        'industry': ['Technology'],
-        'position': ['Senior Manager'],
-        'company_size': ['500-1000'],
-        'website': ['https://example.com'],
-        'assessment_date': ['2024-01-15']
-    }
-    
-    return pd.DataFrame(sample_data)
-
-def convert_gsheets_url(url):
-    """Convert Google Sheets sharing URL to CSV export URL"""
-    if 'docs.google.com/spreadsheets' in url:
-        # Extract the spreadsheet ID from the URL
-        match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', url)
-        if match:
-            spreadsheet_id = match.group(1)
-            return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
-    return url
-
-def load_data_from_url(url):
-    """Load CSV data from URL"""
-    try:
-        # Convert Google Sheets URL if needed
-        csv_url = convert_gsheets_url(url)
-        
-        # Read CSV data
-        response = requests.get(csv_url)
-        response.raise_for_status()
-        
-        # Parse CSV
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        
-        return df, None
-    except Exception as e:
-        return None, str(e)
+from config import (
+    CLEANING_COLUMN_GROUPS, COLUMN_GROUPS, CORE_COLUMN_GROUPS, DELTA_KEY_COLUMN, GRID_COMPACT_ROWS,
+    GRID_DETAIL_ROW_HEIGHT, GRID_PAGE_SIZES, GRID_RENDER_MODES, GRID_ROW_ID_COLUMN, GRID_SERVER_SIDE_ROWS,
+    SIMILARITY_MAX_QUERY_ROWS, SIMILARITY_TOP_K, INSTRUMENTATION_LOG_PATH, PROMETHEUS_TEXTFILE, REFRESH_INTERVALS, SCHEDULER_PICKUP_SECONDS,
+    SUMMARY_COLUMN_GROUPS, TEAM_GROUPINGS, TEAM_MIN_SIZE, TEAM_TOP_N
+)
+from disc_cube import cube_for
+from team_composition import composition_for
+from utils.bounded import bounded_summary_for
+from utils.data_loader import get_sample_data, load_data_from_url, load_data_from_urls
+from utils.exports import EXPORT_FORMATS, available_formats, default_exports, rows_digest
+from utils.instrumentation import (
+    StageRecorder, append_jsonl, prometheus_text, stage, write_prometheus_textfile
+)
+from utils.schema import coerced_values, memory_report
+from utils.validation import validate_rows
+
+# st_aggrid, the delta, dedup, search, similarity, server-side grid and
+# refresh-scheduler modules are imported inside the code paths that use
+# them, so the first page renders without loading them (requests is
+# likewise only imported by the fetch client on the first HTTP fetch)
+
+# The grid reports back row ids only: the selected rows, the rows left
+# after its filters in display order (null while nothing is filtered or
+# sorted) and the filter/sort model. The frames are sliced on the server.
+GRID_RETURN_JS = f"""
+    function({{streamlitRerunEventTriggerName, eventData}}) {{
+        const api = eventData.api;
+        const rowId = data => Number(data['{GRID_ROW_ID_COLUMN}']);
+        const sortModel = api.getColumnState()
+            .filter(c => c.sort)
+            .map(c => ({{colId: c.colId, sort: c.sort, sortIndex: c.sortIndex}}));
+        let filtered = null;
+        if (api.isAnyFilterPresent() || sortModel.length > 0) {{
+            filtered = [];
+            api.forEachNodeAfterFilterAndSort(node => {{
+                if (node.data) filtered.push(rowId(node.data));
+            }});
+        }}
+        return {{
+            selected: api.getSelectedRows().map(rowId),
+            filtered: filtered,
+            filterModel: api.getFilterModel(),
+            sortModel: sortModel
+        }};
+    }}
+"""
+
+def configure_aggrid(df, compact=False):
+    """Configure AgGrid options with enhanced styling
+
+    A GRID_ROW_ID_COLUMN column, if present, is hidden and used as the
+    grid's row id. compact swaps the wrapped, auto-height DISC behavior
+    columns for fixed-height truncated cells (full text in the tooltip) and
+    lets each row expand into a detail pane with the full text. The browser builds
+    that pane only for rows the user expands, so row measurement no
+    longer grows with the dataset.
+    """
+    from st_aggrid import GridOptionsBuilder, JsCode
 
-def configure_aggrid(df):
-    """Configure AgGrid options with enhanced styling"""
     gb = GridOptionsBuilder.from_dataframe(df)
     
     # Enable features
@@ -139,46 +129,322 @@ def configure_aggrid(df):
     }
     
     # Apply column configurations
+    wrapped = [col for col, config in column_configs.items() if config.get('wrapText') and col in df.columns]
     for col, config in column_configs.items():
         if col in df.columns:
+            extra = {'tooltipField': col} if compact and col in wrapped else {}
             gb.configure_column(
                 col, 
                 width=config.get('width', 100),
                 pinned=config.get('pinned', None),
-                wrapText=config.get('wrapText', False),
-                autoHeight=config.get('autoHeight', False),
-                cellStyle=config.get('cellStyle', {})
+                wrapText=config.get('wrapText', False) and not compact,
+                autoHeight=config.get('autoHeight', False) and not compact,
+                cellStyle=config.get('cellStyle', {}),
+                **extra
             )
+
+    # Compact mode: master/detail row expansion with the full behavior text
+    if compact and wrapped:
+        fields = [{'field': col, 'label': col.replace('_', ' ').title()} for col in wrapped]
+        gb.configure_column(df.columns[0], cellRenderer='agGroupCellRenderer')
+        gb.configure_grid_options(
+            masterDetail=True,
+            detailRowHeight=GRID_DETAIL_ROW_HEIGHT,
+            tooltipShowDelay=300,
+            detailCellRendererParams={
+                'detailGridOptions': {
+                    'columnDefs': [
+                        {'field': 'behavior', 'width': 220},
+                        {'field': 'text', 'flex': 1, 'wrapText': True, 'autoHeight': True},
+                    ],
+                },
+                'getDetailRowData': JsCode(f"""
+                    function(params) {{
+                        const fields = {json.dumps(fields)};
+                        params.successCallback(fields
+                            .filter(f => params.data[f.field] != null)
+                            .map(f => ({{behavior: f.label, text: String(params.data[f.field])}})));
+                    }}
+                """),
+            }
+        )
     
+    if GRID_ROW_ID_COLUMN in df.columns:
+        gb.configure_column(GRID_ROW_ID_COLUMN, hide=True, suppressColumnsToolPanel=True)
+        gb.configure_grid_options(
+            getRowId=JsCode(f"function(params) {{ return String(params.data['{GRID_ROW_ID_COLUMN}']); }}")
+        )
+
     gridOptions = gb.build()
     return gridOptions
 
-def display_data_summary(df):
-    """Display comprehensive data summary"""
+def grid_rows(df, ids):
+    """Rows of df at the row ids the grid returned, in that order
+
+    Ids are positions in df, so this is a positional slice that keeps df's
+    dtypes; ids outside df (from a grid rendered before a refresh) are
+    dropped.
+    """
+    positions = np.asarray(ids if ids is not None else [], dtype=np.int64)
+    positions = positions[(positions >= 0) & (positions < len(df))]
+    return df.iloc[positions], positions
+
+def similar_people(df, request):
+    """(positions, scores) of the people matching a similar-people request
+
+    request holds the query people's positions in df, k and the mode:
+    'group' ranks everyone against the group's combined profile, 'each'
+    merges every query person's own top k (best score per person).
+    """
+    from utils.similarity import similarity_index_for
+
+    index = similarity_index_for(df)
+    positions = np.asarray(request['positions'], dtype=np.int64)
+    positions = positions[(positions >= 0) & (positions < len(df))]
+    if not len(positions):
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    if len(positions) == 1:
+        return index.top_k(positions[0], request['k'])
+    if request['mode'] == 'group':
+        return index.similar_to_group(positions, request['k'])
+    top, scores = index.top_k_batch(positions, request['k'])
+    found = (top >= 0) & ~np.isin(top, positions)
+    best = pd.Series(scores[found]).groupby(top[found]).max().sort_values(ascending=False, kind='stable')
+    return best.index.to_numpy(dtype=np.int64), best.to_numpy()
+
+def display_data_summary(df, aggregates=None, bounded=None):
+    """Display comprehensive data summary
+
+    aggregates optionally maps column name to precomputed value counts
+    (as maintained by IncrementalSnapshot) so they aren't rescanned. DISC
+    distributions and cross-tabs come from the cached aggregation cube.
+    bounded is the BoundedSummary when df is only a sample; totals and
+    the cube then describe the whole sheet.
+    """
+    aggregates = aggregates or {}
     st.subheader("📊 Data Summary")
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Records", len(df))
+        st.metric("Total Records", bounded.rows if bounded else len(df))
     with col2:
         st.metric("Total Columns", len(df.columns))
     with col3:
-        unique_companies = df['company_id'].nunique() if 'company_id' in df.columns else 0
-        st.metric("Unique Companies", unique_companies)
+        with stage('summary_unique_companies', rows=len(df)):
+            if bounded:
+                unique_companies = bounded.unique_companies
+            elif 'company_id' in aggregates:
+                unique_companies = len(aggregates['company_id'])
+            else:
+                unique_companies = df['company_id'].nunique() if 'company_id' in df.columns else 0
+        approximate = bounded is not None and bounded.unique_error > 0
+        st.metric(
+            "Unique Companies" + (" (≈)" if approximate else ""), unique_companies,
+            help=f"HyperLogLog estimate, ±{bounded.unique_error:.1%} typical error" if approximate else None
+        )
+    with stage('summary_disc_cube', rows=len(df)):
+        cube = bounded.cube if bounded else cube_for(df)
+        disc_counts = cube.distribution('disc_profile')
     with col4:
-        disc_profiles = df['disc_profile'].nunique() if 'disc_profile' in df.columns else 0
+        disc_profiles = len(disc_counts) if disc_counts is not None else 0
         st.metric("DISC Profiles", disc_profiles)
     
     # DISC Profile Distribution
-    if 'disc_profile' in df.columns:
+    if disc_counts is not None:
         st.subheader("🎯 DISC Profile Distribution")
-        disc_counts = df['disc_profile'].value_counts()
         col1, col2 = st.columns([1, 2])
         with col1:
             st.dataframe(disc_counts.reset_index())
         with col2:
             st.bar_chart(disc_counts)
 
+    # Cross-tabs between any two cube dimensions
+    if len(cube.dimensions) >= 2:
+        with st.expander("🔀 DISC Cross-tab"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                rows = st.selectbox("Rows", cube.dimensions, index=0)
+            with col2:
+                others = [dim for dim in cube.dimensions if dim != rows]
+                columns = st.selectbox("Columns", others, index=0)
+            with col3:
+                profiles = ["All"] + disc_counts.index.tolist() if disc_counts is not None else ["All"]
+                profile = st.selectbox("DISC profile", profiles)
+            where = {'disc_profile': profile} if profile != "All" else None
+            with stage('summary_crosstab'):
+                crosstab = cube.crosstab(rows, columns, where=where)
+            st.dataframe(crosstab, use_container_width=True)
+
+    groupings = {label: col for label, col in TEAM_GROUPINGS.items() if col in df.columns}
+    if groupings and 'disc_profile' in df.columns:
+        with st.expander("👥 Team Composition" + (" (sampled rows)" if bounded else "")):
+            display_team_composition(df, groupings)
+
+def display_team_composition(df, groupings):
+    """Most/least balanced teams and a per-team drill-down
+
+    Everything is read from the cached TeamComposition of df, computed in
+    one groupby per grouping column.
+    """
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        label = st.selectbox("Team by", list(groupings))
+    with col2:
+        top_n = st.number_input("Teams to show", min_value=1, max_value=100, value=TEAM_TOP_N)
+    with col3:
+        min_size = st.number_input("Minimum team size", min_value=1, value=TEAM_MIN_SIZE)
+    by = groupings[label]
+    with stage('team_composition', rows=len(df), by=by):
+        composition = composition_for(df, by)
+    st.caption(
+        f"{len(composition.table):,} teams • balance is 1 for an even D/I/S/C mix "
+        "and 0 for a single-profile team"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Most balanced**")
+        st.dataframe(composition.ranked(top_n, True, min_size), use_container_width=True)
+    with col2:
+        st.write("**Least balanced**")
+        st.dataframe(composition.ranked(top_n, False, min_size), use_container_width=True)
+
+    team = st.selectbox(f"{label} drill-down", composition.table.index.tolist())
+    detail = composition.drill_down(team)
+    if detail is None:
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write("**DISC profiles**")
+        profiles = detail['disc_profile'].rename(index=lambda p: f"{p} - {detail['profile_names'][p]}")
+        st.dataframe(profiles, use_container_width=True)
+    with col2:
+        if 'leadership_style' in detail:
+            st.write("**Leadership styles**")
+            st.dataframe(detail['leadership_style'], use_container_width=True)
+    with col3:
+        if 'conflict_resolution' in detail:
+            st.write("**Conflict resolution**")
+            st.dataframe(detail['conflict_resolution'], use_container_width=True)
+
+def server_side_table_controls(df, rows=None):
+    """Render server-side sort/filter/group/paging controls for df
+
+    Returns (positions of the current page, row positions matching the
+    filters in sort order). Only the page is sent to the browser grid.
+    rows restricts the table to those positions (search hits or similar
+    people), in their given order until a sort is chosen.
+    """
+    from utils.grid_query import engine_for
+
+    engine = engine_for(df)
+    none = "(none)"
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_col = st.selectbox("Sort by", [none] + list(df.columns))
+    with col2:
+        descending = st.checkbox("Descending", value=False)
+    with col3:
+        filter_col = st.selectbox("Filter column", [none] + list(df.columns))
+    filters = {}
+    with col4:
+        if filter_col != none:
+            if isinstance(df[filter_col].dtype, pd.CategoricalDtype):
+                values = st.multiselect("Values", df[filter_col].cat.categories.tolist())
+                filters[filter_col] = {'type': 'in', 'value': values}
+            else:
+                text = st.text_input("Contains")
+                filters[filter_col] = {'type': 'contains', 'value': text}
+
+    sort = (sort_col, not descending) if sort_col != none else None
+    positions = engine.positions(sort, filters, rows)
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", GRID_PAGE_SIZES, index=1)
+    pages = max(1, math.ceil(len(positions) / page_size))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+    with col3:
+        st.caption(f"{len(positions):,} matching rows • page {page + 1} of {pages} • sorted and filtered on the server")
+
+    groupable = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    group_by = st.multiselect("Group by (server-side counts)", groupable)
+    if group_by:
+        st.dataframe(engine.group_counts(group_by, filters, rows), use_container_width=True)
+
+    start = page * page_size
+    return positions[start:start + page_size], positions
+
+def export_button(label, base_df, subset, build_frame, file_stem, fmt):
+    """Download button whose file is generated (and memoized) only on click"""
+    spec = EXPORT_FORMATS[fmt]
+    st.download_button(
+        label=f"{label} as {fmt}",
+        data=default_exports.deferred(base_df, subset, fmt, build_frame),
+        file_name=f"{file_stem}.{spec['extension']}",
+        mime=spec['mime']
+    )
+
+def group_label(group):
+    return group.replace('_', ' ').title()
+
+def watch_sources(urls, refresh_interval, frames=None, groups=None):
+    """Renew this session's scheduler leases; return the combined data version"""
+    from utils.refresh_scheduler import default_scheduler
+
+    if 'watcher_id' not in st.session_state:
+        st.session_state['watcher_id'] = uuid.uuid4().hex
+    frames = frames or {}
+    # Per-source versions only ever increase, so their sum changes
+    # whenever any one source publishes
+    return sum(
+        default_scheduler.watch(
+            url, refresh_interval, st.session_state['watcher_id'], frames.get(url), groups
+        )
+        for url in urls
+    )
+
+def show_diagnostics(recorder, log_to_file):
+    """Sidebar panel with this run's stage timings and the metrics exports"""
+    records = recorder.records
+    if log_to_file and records:
+        append_jsonl(records, INSTRUMENTATION_LOG_PATH)
+
+    with st.sidebar:
+        st.subheader("🩺 Diagnostics")
+        st.caption(f"Run {recorder.run_id}: {recorder.total_seconds() * 1000:,.0f} ms in instrumented stages")
+        if records:
+            table = pd.DataFrame([
+                {
+                    'stage': '  ' * record['depth'] + record['stage'],
+                    'ms': round(record['seconds'] * 1000, 1),
+                    'network_ms': round(record['network_seconds'] * 1000, 1)
+                                  if 'network_seconds' in record else None,
+                    'rows': record.get('rows'),
+                    'bytes': record.get('bytes'),
+                    'memory_delta_mb': round(record['memory_delta_bytes'] / 1e6, 1)
+                                       if 'memory_delta_bytes' in record else None,
+                }
+                for record in sorted(records, key=lambda record: record['started'])
+            ])
+            st.dataframe(table, hide_index=True, use_container_width=True)
+        if log_to_file:
+            st.caption(f"Appending to {INSTRUMENTATION_LOG_PATH}")
+        st.download_button(
+            "📈 Prometheus metrics",
+            data=prometheus_text,
+            file_name="disc_viewer_metrics.prom",
+            mime="text/plain"
+        )
+
+@st.fragment(run_every=SCHEDULER_PICKUP_SECONDS)
+def watch_for_new_data(urls, refresh_interval, groups=None):
+    """Rerun the app once the background scheduler publishes a newer version"""
+    if watch_sources(urls, refresh_interval, groups=groups) != st.session_state.get('data_version'):
+        st.rerun()
+
 def main():
     st.set_page_config(
         page_title="Live CSV Data Viewer - DISC Profiles",
@@ -186,6 +452,8 @@ def main():
         layout="wide"
     )
     
+    recorder = StageRecorder().activate()
+
     st.title("📊 Live CSV Data Viewer - DISC Profiles & Personnel Data")
     st.markdown("*Optimized for personnel data with DISC assessments and company information*")
     st.markdown("---")
@@ -202,10 +470,11 @@ def main():
         )
         
         if data_source != "Sample Data":
-            url_input = st.text_input(
-                "Enter URL:",
+            url_input = st.text_area(
+                "Enter URL(s):",
                 placeholder="https://docs.google.com/spreadsheets/d/your-sheet-id/edit#gid=0",
-                help="Paste your Google Sheets sharing URL or direct CSV URL"
+                help="Paste your Google Sheets sharing URL or direct CSV URL. "
+                     "Enter one URL per line to load and combine several sheets or tabs."
             )
         else:
             url_input = None
@@ -214,26 +483,171 @@ def main():
         st.subheader("📋 Display Options")
         show_summary = st.checkbox("Show Data Summary", value=True)
         show_column_info = st.checkbox("Show Column Information", value=False)
+        table_groups = st.multiselect(
+            "Table column groups",
+            COLUMN_GROUPS,
+            default=COLUMN_GROUPS,
+            format_func=group_label,
+            help="Only the groups the open views need are parsed; personal and "
+                 "DISC columns are always loaded"
+        )
+        export_format = st.selectbox("Export format", available_formats())
+        render_mode = st.selectbox(
+            "Table rendering",
+            GRID_RENDER_MODES,
+            help=f"Auto wraps the DISC behavior text up to {GRID_COMPACT_ROWS:,} rows "
+                 "and switches to compact rows with an expandable detail pane above that"
+        )
+        quarantine_invalid = st.checkbox(
+            "Quarantine invalid rows",
+            value=False,
+            help="Hide rows that fail validation (bad e-mails, unknown DISC codes, "
+                 "missing dates, duplicate e-mails) from the dashboard"
+        )
+        merge_duplicates = st.checkbox(
+            "Merge duplicate people",
+            value=False,
+            help="Cluster likely duplicates (normalized e-mail, phone and name) "
+                 "and keep the newest record of each person by assessment date"
+        )
         
         # Auto-refresh option
         st.subheader("🔄 Refresh Settings")
         auto_refresh = st.checkbox("Auto-refresh data", value=False)
         if auto_refresh:
-            refresh_interval = st.slider("Refresh interval (seconds)", 10, 300, 60)
+            refresh_interval = st.select_slider(
+                "Refresh interval (seconds)", options=REFRESH_INTERVALS, value=60
+            )
+        incremental = st.checkbox(
+            "Incremental refresh",
+            value=True,
+            help="Diff each load against the previous one and update only what changed"
+        )
+        if incremental:
+            delta_key = st.text_input("Primary key column", value=DELTA_KEY_COLUMN)
         
         # Manual refresh button
         refresh_button = st.button("🔄 Refresh Data", type="primary")
+
+        show_diagnostics_panel = st.checkbox(
+            "🩺 Show diagnostics",
+            value=False,
+            help="Per-stage wall time, rows/bytes processed and memory delta for this run"
+        )
+        log_stages = show_diagnostics_panel and st.checkbox("Append stage timings to log file", value=False)
     
+    urls = [line.strip() for line in url_input.splitlines() if line.strip()] if url_input else []
+
+    # Column projection: parse only the groups the open views need, plus
+    # any group loaded on demand from the Column Information panel
+    wanted_groups = set(CORE_COLUMN_GROUPS) | set(table_groups)
+    wanted_groups |= set(st.session_state.get('extra_column_groups', []))
+    if show_summary:
+        wanted_groups |= set(SUMMARY_COLUMN_GROUPS)
+    if quarantine_invalid or merge_duplicates:
+        wanted_groups |= set(CLEANING_COLUMN_GROUPS)
+    column_groups = None
+    if not wanted_groups >= set(COLUMN_GROUPS):
+        column_groups = [group for group in COLUMN_GROUPS if group in wanted_groups]
+
     # Load data based on source
     df = None
     error = None
+    aggregates = None
+    report = None
+    duplicates = None
+    bounded = None
     
     if data_source == "Sample Data":
         df = get_sample_data()
         st.info("📝 Displaying sample data with the provided example record")
-    elif url_input:
-        with st.spinner("Loading data from URL..."):
-            df, error = load_data_from_url(url_input)
+    elif urls:
+        # Reuse the cached frame unless it is older than the refresh cadence
+        max_age = None
+        if refresh_button:
+            max_age = 0
+        elif auto_refresh:
+            max_age = refresh_interval
+        progress = st.empty()
+        preview = st.empty()
+
+        def show_progress(chunk, rows_loaded):
+            progress.caption(f"⏳ Loaded {rows_loaded:,} rows so far...")
+            if rows_loaded == len(chunk):
+                preview.dataframe(chunk.head(20), use_container_width=True)
+
+        source_frames = {}
+        if len(urls) == 1:
+            with st.spinner("Loading data from URL..."):
+                df, error = load_data_from_url(
+                    urls[0], max_age=max_age, on_chunk=show_progress, groups=column_groups
+                )
+            source_frames[urls[0]] = df
+        else:
+            with st.spinner(f"Loading data from {len(urls)} URLs..."), \
+                    stage('load_data_from_urls', sources=len(urls)) as record:
+                df, source_errors, source_frames = load_data_from_urls(
+                    urls, max_age=max_age, groups=column_groups
+                )
+                record['rows'] = len(df) if df is not None else 0
+            for url, message in source_errors.items():
+                st.warning(f"⚠️ Skipped {url}: {message}")
+            if df is None:
+                error = "None of the sources could be loaded"
+        progress.empty()
+        preview.empty()
+
+        # Past the memory ceiling the loader streams the sheet and returns
+        # a sample; every view below except the summary works on the sample
+        bounded = bounded_summary_for(df) if df is not None else None
+        if bounded:
+            st.warning(
+                f"🧪 Sampled view: this sheet is too large for the "
+                f"{bounded.memory_limit / 2**20:,.0f} MB memory ceiling, so the table, "
+                f"validation and search show a uniform random sample of "
+                f"{bounded.sample_rows:,} of {bounded.rows:,} rows. Totals and DISC "
+                f"distributions in the summary are exact."
+            )
+
+        # Merge duplicates before validating: the duplicate_email rule keeps
+        # the first row, which would quarantine the newer assessment that
+        # merging is meant to keep
+        if df is not None:
+            if merge_duplicates:
+                from utils.dedup import find_duplicates
+
+                with stage('deduplicate', rows=len(df)) as record:
+                    duplicates = find_duplicates(df)
+                    record['removed'] = duplicates.duplicates_removed
+                df = duplicates.deduplicated()
+            with stage('validate_rows', rows=len(df)):
+                report = validate_rows(df)
+            if quarantine_invalid:
+                df = report.valid_frame()
+
+        if auto_refresh:
+            st.session_state['data_version'] = watch_sources(urls, refresh_interval, source_frames, column_groups)
+
+        # A fresh sample shares few rows with the last one, so there is
+        # nothing to diff in bounded mode
+        if df is not None and incremental and not bounded:
+            from utils.delta import IncrementalSnapshot
+
+            snapshot_key = (url_input, delta_key, tuple(column_groups or COLUMN_GROUPS))
+            snapshot = st.session_state.get('delta_snapshot')
+            if snapshot is None or st.session_state.get('delta_snapshot_key') != snapshot_key:
+                snapshot = IncrementalSnapshot(key=delta_key)
+                st.session_state['delta_snapshot'] = snapshot
+                st.session_state['delta_snapshot_key'] = snapshot_key
+            with stage('incremental_refresh', rows=len(df)):
+                delta = snapshot.apply(df)
+            aggregates = snapshot.aggregates
+            if not delta['full_rebuild']:
+                st.caption(
+                    f"🔄 Incremental refresh: {delta['inserted']:,} new, "
+                    f"{delta['updated']:,} updated, {delta['deleted']:,} removed, "
+                    f"{delta['unchanged']:,} unchanged"
+                )
     
     # Display data or error
     if error:
@@ -245,10 +659,46 @@ def main():
         st.info("📝 Showing sample data instead:")
         df = get_sample_data()
     
+    # Cells the typed schema couldn't parse were blanked while loading
+    coerced = coerced_values(report.df) if report is not None else {}
+    if coerced:
+        st.warning(
+            "⚠️ Unparsable values were left empty: "
+            + ", ".join(f"{lost:,} in {col}" for col, lost in coerced.items())
+        )
+
+    # Row-level validation results
+    if report is not None and report.invalid_rows:
+        label = "quarantined" if quarantine_invalid else "with issues"
+        with st.expander(f"🧪 Data Quality: {report.invalid_rows:,} of {len(report.df):,} rows {label}"):
+            st.dataframe(report.summary(), hide_index=True, use_container_width=True)
+            failing = [rule for rule, rows in report.violations.items() if len(rows)]
+            rule = st.selectbox("Show offending rows for", failing)
+            st.dataframe(report.offending_rows(rule).head(1000), use_container_width=True)
+            export_button(
+                "📥 Download Invalid Rows", report.df, 'invalid',
+                report.quarantined_frame, "invalid_personnel_data", export_format
+            )
+        if df.empty:
+            st.warning("⚠️ Every row failed validation; untick 'Quarantine invalid rows' to show them anyway")
+
+    # Duplicate clusters merged by the dedup stage
+    if duplicates is not None and duplicates.duplicates_removed:
+        with st.expander(
+            f"🧬 Duplicates: {duplicates.duplicates_removed:,} records merged "
+            f"into {duplicates.duplicate_groups:,} people"
+        ):
+            st.caption(
+                f"{duplicates.candidate_pairs:,} candidate pairs compared in "
+                f"{duplicates.seconds * 1000:,.0f} ms • the row marked kept is each person's newest"
+            )
+            st.dataframe(duplicates.clusters().head(1000), use_container_width=True)
+
     if df is not None and not df.empty:
         # Display data summary
         if show_summary:
-            display_data_summary(df)
+            with stage('data_summary', rows=len(df)):
+                display_data_summary(df, aggregates, bounded)
             st.markdown("---")
         
         # Display column information
@@ -290,62 +740,185 @@ def main():
                     for col in other_cols:
                         if col in df.columns:
                             st.write(f"• {col}")
+
+                if column_groups is not None:
+                    st.write("**⏳ Column groups not loaded for this view:**")
+                    for group in COLUMN_GROUPS:
+                        if group not in column_groups and st.button(
+                            f"Load {group_label(group)} columns", key=f"load_columns_{group}"
+                        ):
+                            st.session_state.setdefault('extra_column_groups', []).append(group)
+                            st.rerun()
+
+                st.write("**💾 Memory by Column (typed vs. raw strings):**")
+                with stage('memory_report', rows=len(df)):
+                    memory = memory_report(df)
+                total = memory.iloc[-1]
+                st.caption(
+                    f"{total['before_bytes'] / 1e6:,.1f} MB as strings → "
+                    f"{total['after_bytes'] / 1e6:,.1f} MB typed"
+                )
+                st.dataframe(memory, use_container_width=True)
         
         # Configure and display AgGrid
         st.subheader("📊 Interactive Data Table")
         
         try:
-            gridOptions = configure_aggrid(df)
-            
-            grid_response = AgGrid(
-                df,
-                gridOptions=gridOptions,
-                data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
-                update_mode=GridUpdateMode.MODEL_CHANGED,
-                fit_columns_on_grid_load=False,
-                theme='streamlit',
-                enable_enterprise_modules=True,
-                height=600,
-                width='100%',
-                reload_data=refresh_button or auto_refresh
+            # Server-side people search over the prebuilt inverted index
+            search_query = st.text_input(
+                "🔍 Search people",
+                placeholder="Name, email, position, industry or city (prefixes work, e.g. 'jo do')"
             )
+            search_rows = None
+            if search_query.strip():
+                from utils.search_index import search_index_for
+
+                with stage('search', rows=len(df)) as record:
+                    index = search_index_for(tuple(urls) or data_source, df)
+                    search_rows = index.search(search_query)
+                    record['matches'] = len(search_rows)
+                stats = index.stats
+                st.caption(
+                    f"{len(search_rows):,} matches • index: {stats['tokens']:,} tokens, "
+                    f"{stats['memory_bytes'] / 1e6:,.1f} MB, {stats['mode']} build of "
+                    f"{stats['new_rows']:,} rows in {stats['build_seconds'] * 1000:,.0f} ms"
+                )
+
+            # Similar-people view requested from the selection below; it
+            # narrows the table to the matches, best first
+            view_rows = search_rows
+            similarity = None
+            similar_request = st.session_state.get('similar_people')
+            if similar_request:
+                with stage('similar_people', rows=len(df)) as record:
+                    similar_rows, similar_scores = similar_people(df, similar_request)
+                    record['matches'] = len(similar_rows)
+                if search_rows is not None:
+                    hits = np.isin(similar_rows, search_rows)
+                    similar_rows, similar_scores = similar_rows[hits], similar_scores[hits]
+                view_rows = similar_rows
+                similarity = pd.Series(similar_scores, index=similar_rows)
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.caption(
+                        f"🧭 Showing {len(similar_rows):,} people most similar to "
+                        f"{len(similar_request['positions']):,} selected, by shared DISC behaviors"
+                    )
+                with col2:
+                    if st.button("✖ Clear similar people"):
+                        del st.session_state['similar_people']
+                        st.rerun()
+
+            # Large datasets are paged on the server; the grid gets one page
+            server_side = len(df) > GRID_SERVER_SIDE_ROWS
+            if server_side:
+                with stage('server_side_query', rows=len(df)):
+                    grid_positions, server_positions = server_side_table_controls(df, view_rows)
+                grid_df = df.iloc[grid_positions]
+            elif view_rows is not None:
+                grid_positions = view_rows
+                grid_df = df.iloc[view_rows]
+            else:
+                grid_positions = np.arange(len(df))
+                grid_df = df
+
+            # Wrapped, auto-height cells make the browser measure every row;
+            # past the threshold switch to compact rows with a detail pane
+            if render_mode == 'Auto':
+                compact = len(grid_df) > GRID_COMPACT_ROWS
+            else:
+                compact = render_mode == 'Compact'
+            grid_df = grid_df.assign(**{GRID_ROW_ID_COLUMN: grid_positions})
+            if similarity is not None:
+                grid_df = grid_df.assign(similarity=similarity.reindex(grid_positions).round(3).to_numpy())
+            with stage('grid_config', rows=len(grid_df)) as record:
+                gridOptions = configure_aggrid(grid_df, compact=compact)
+                record['mode'] = 'compact' if compact else 'wrapped'
+            if compact:
+                st.caption(
+                    f"🧾 Compact rendering ({len(grid_df):,} rows): behavior text is truncated; "
+                    "expand a row (▸) to read it in full"
+                )
+            else:
+                st.caption(f"🧾 Wrapped-text rendering ({len(grid_df):,} rows)")
+            
+            # The grid gets a copy tagged with each row's position in df and
+            # returns positions only; the cached, shared frame stays untouched
+            from st_aggrid import AgGrid, DataReturnMode, GridUpdateMode, JsCode
+
+            with stage('grid_render', rows=len(grid_df)):
+                grid_response = AgGrid(
+                    grid_df,
+                    gridOptions=gridOptions,
+                    data_return_mode=DataReturnMode.CUSTOM,
+                    custom_jscode_for_grid_return=JsCode(GRID_RETURN_JS),
+                    update_mode=GridUpdateMode.MODEL_CHANGED,
+                    fit_columns_on_grid_load=False,
+                    theme='streamlit',
+                    enable_enterprise_modules=True,
+                    allow_unsafe_jscode=True,
+                    height=600,
+                    width='100%',
+                    reload_data=refresh_button or auto_refresh
+                )
             
             # Display selection info
-            if grid_response['selected_rows'] is not None and len(grid_response['selected_rows']) > 0:
+            selected_df, selected_positions = grid_rows(df, grid_response.get('selected'))
+            if len(selected_df) > 0:
                 st.subheader("✅ Selected Records")
-                selected_df = pd.DataFrame(grid_response['selected_rows'])
                 st.dataframe(selected_df, use_container_width=True)
                 
                 # Download selected data
-                csv = selected_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Selected Data as CSV",
-                    data=csv,
-                    file_name="selected_personnel_data.csv",
-                    mime="text/csv"
+                export_button(
+                    "📥 Download Selected Data", df, ('selected', rows_digest(selected_positions)),
+                    lambda: selected_df, "selected_personnel_data", export_format
                 )
+
+                # Find people who share the selection's DISC behaviors
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    k = st.number_input("Similar people", min_value=1, max_value=1000, value=SIMILARITY_TOP_K)
+                with col2:
+                    mode = st.radio(
+                        "Match against", ['group', 'each'], horizontal=True,
+                        format_func={'group': "the selection as a group", 'each': "each selected person"}.get
+                    )
+                with col3:
+                    if st.button("🧭 Show similar people"):
+                        st.session_state['similar_people'] = {
+                            'positions': selected_positions[:SIMILARITY_MAX_QUERY_ROWS].tolist(),
+                            'k': int(k),
+                            'mode': mode
+                        }
+                        st.rerun()
             
             # Download all data
             st.markdown("---")
             col1, col2 = st.columns(2)
             with col1:
-                csv_all = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download All Data as CSV",
-                    data=csv_all,
-                    file_name="personnel_data.csv",
-                    mime="text/csv"
+                export_button(
+                    "📥 Download All Data", df, 'all',
+                    lambda: df, "personnel_data", export_format
                 )
             
             with col2:
                 # Export filtered data
-                filtered_df = pd.DataFrame(grid_response['data'])
-                csv_filtered = filtered_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Filtered Data as CSV",
-                    data=csv_filtered,
-                    file_name="filtered_personnel_data.csv",
-                    mime="text/csv"
+                if server_side:
+                    filtered_subset = ('filtered', rows_digest(server_positions))
+                    build_filtered = lambda: df.iloc[server_positions]
+                else:
+                    filtered_ids = grid_response.get('filtered')
+                    if filtered_ids is None:
+                        # Nothing filtered or sorted in the grid: all of its rows
+                        filtered_ids = grid_positions
+                    filtered_df, filtered_positions = grid_rows(df, filtered_ids)
+                    if grid_response.get('filterModel'):
+                        st.caption(f"Grid filters: {', '.join(grid_response['filterModel'])}")
+                    filtered_subset = ('filtered', rows_digest(filtered_positions))
+                    build_filtered = lambda: filtered_df
+                export_button(
+                    "📥 Download Filtered Data", df, filtered_subset,
+                    build_filtered, "filtered_personnel_data", export_format
                 )
             
         except Exception as e:
@@ -380,11 +953,17 @@ def main():
         - **Assessment Tracking**: Dates, sources, and progress monitoring
         """)
     
-    # Auto-refresh functionality
-    if auto_refresh and (url_input or data_source == "Sample Data"):
-        import time
-        time.sleep(refresh_interval)
-        st.rerun()
+    # The textfile feeds the node exporter whether or not anyone is
+    # looking at the panel
+    if PROMETHEUS_TEXTFILE:
+        write_prometheus_textfile(PROMETHEUS_TEXTFILE)
+    if show_diagnostics_panel:
+        show_diagnostics(recorder, log_stages)
+
+    # Auto-refresh: the shared scheduler polls the source in the background,
+    # this session only checks for a newer version without blocking
+    if auto_refresh and urls:
+        watch_for_new_data(urls, refresh_interval, column_groups)
 
 if __name__ == "__main__":
     main()
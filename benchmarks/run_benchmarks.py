@@ -0,0 +1,220 @@
+"""
+Headless benchmark of the load -> validate -> analyze -> render pipeline.
+
+For each dataset size a synthetic CSV is served by a local HTTP server and
+every stage is timed, then run again in a fresh interpreter to measure
+how far it raises the process's peak resident memory, which unlike
+tracemalloc also sees pyarrow and other native buffers. Results are
+written as JSON; pass --baseline to print the speed-up against an
+earlier run.
+
+    python -m benchmarks.run_benchmarks --rows 1000 10000 100000 --output bench.json
+"""
+import argparse
+import functools
+import http.server
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Keep the benchmark from writing snapshots next to the app
+os.environ.setdefault('DISC_SNAPSHOT_DIR', tempfile.mkdtemp(prefix='disc-bench-snapshots-'))
+
+import pandas as pd
+
+from app import configure_aggrid
+from benchmarks.synthetic_data import write_csv
+from disc_analyzer import analyze_disc_profile
+from disc_cube import DiscCube
+from utils.data_loader import load_data_from_url, validate_data_structure
+from utils.exports import available_formats, write_export
+from utils.fetch_cache import default_cache
+from utils.instrumentation import current_rss
+
+DEFAULT_ROWS = [1000, 10000, 100000]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_directory(directory):
+    """Start a local HTTP stand-in for the sheet export; returns (server, base URL)"""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _cold_load(url):
+    # Drop the in-memory entry so the stage measures a real download + parse
+    default_cache.invalidate()
+    df, error = load_data_from_url(url, max_age=0)
+    if error:
+        raise RuntimeError(error)
+    return df
+
+
+def pipeline_stages(url, df):
+    """(name, zero-argument callable) for every benchmarked stage"""
+    # Warm the per-dataset cube so the cached stage measures a rerun
+    analyze_disc_profile(df)
+    stages = [
+        ('load_data_from_url', lambda: _cold_load(url)),
+        ('validate_data_structure', lambda: validate_data_structure(df)),
+        # A fresh cube each time so the uncached cost is measured
+        ('analyze_disc_profile', lambda: DiscCube.from_frame(df)),
+        ('analyze_disc_profile_cached', lambda: analyze_disc_profile(df)),
+        ('configure_aggrid', lambda: configure_aggrid(df)),
+    ]
+    for fmt in available_formats():
+        stages.append((f"export[{fmt}]", functools.partial(write_export, df, fmt)))
+    return stages
+
+
+def measure(func):
+    """Wall seconds of one call of func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _reset_peak_rss():
+    # Linux 4.0+ resets the VmHWM high-water mark on this write
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure_stage_memory(url, stage):
+    """Peak RSS growth of stage in this (fresh) process; printed as JSON"""
+    if stage == 'load_data_from_url':
+        func = functools.partial(_cold_load, url)
+    else:
+        func = dict(pipeline_stages(url, _cold_load(url)))[stage]
+    # Without a reset the loads above may already hold the high-water mark,
+    # so the growth is a lower bound there
+    _reset_peak_rss()
+    before = current_rss()
+    func()
+    peak = _peak_rss()
+    growth = max(peak - before, 0) if peak is not None and before is not None else None
+    print(json.dumps({'peak_bytes': growth}))
+
+
+def measure_memory(url, stage):
+    """Peak RSS growth in bytes of stage, run in a subprocess, or None"""
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.run_benchmarks', '--measure-stage', stage, '--url', url],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        print(completed.stderr, file=sys.stderr)
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])['peak_bytes']
+
+
+def run(rows_list, memory=True, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix='disc-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    server, base_url = serve_directory(workdir)
+    results = []
+    try:
+        for n_rows in rows_list:
+            name = f"synthetic_{n_rows}.csv"
+            path = os.path.join(workdir, name)
+            if not os.path.exists(path):
+                write_csv(path, n_rows)
+            url = f"{base_url}/{name}"
+            df = _cold_load(url)
+            for stage, func in pipeline_stages(url, df):
+                seconds = measure(func)
+                peak = measure_memory(url, stage) if memory else None
+                results.append({
+                    'rows': n_rows,
+                    'stage': stage,
+                    'seconds': seconds,
+                    'peak_bytes': peak,
+                    'file_bytes': os.path.getsize(path),
+                })
+                print(f"{n_rows:>9,} rows  {stage:<30} {seconds * 1000:>10.1f} ms"
+                      + (f"  peak {peak / 1e6:>8.1f} MB" if peak is not None else ""))
+    finally:
+        server.shutdown()
+    return results
+
+
+def environment():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    print("\nversus baseline:")
+    for result in results:
+        old = baseline.get((result['rows'], result['stage']))
+        if old and result['seconds'] > 0:
+            print(f"{result['rows']:>9,} rows  {result['stage']:<30} "
+                  f"{old['seconds'] / result['seconds']:>6.2f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DISC data pipeline")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help="dataset sizes to run (default: %(default)s)")
+    parser.add_argument('--output', default='bench_results.json', help="JSON results file")
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--no-memory', action='store_true', help="skip the per-stage memory subprocesses")
+    parser.add_argument('--workdir', help="directory for generated CSVs (reused between runs)")
+    parser.add_argument('--measure-stage', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_stage:
+        _measure_stage_memory(args.url, args.measure_stage)
+        return
+
+    results = run(args.rows, memory=not args.no_memory, workdir=args.workdir)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Cold import time of each entry point.
+
+Every entry point is imported in a fresh interpreter (so nothing is
+cached in sys.modules) several times; the median wall time is reported
+together with the heavy third-party modules the import pulled in.
+
+    python -m benchmarks.startup_time --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    'app',
+    'disc_analyzer',
+    'disc_cube',
+    'team_composition',
+    'disc_report',
+    'utils.data_loader',
+    'utils.exports',
+    'benchmarks.synthetic_data',
+]
+
+HEAVY_MODULES = ['streamlit', 'st_aggrid', 'requests', 'pyarrow', 'plotly', 'pandas', 'numpy']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module):
+    """Import module in a fresh interpreter; return its probe record"""
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    # Streamlit may log to stdout on import; the probe's JSON is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(modules, repeat):
+    results = []
+    for module in modules:
+        probes = [time_import(module) for _ in range(repeat)]
+        seconds = [probe['seconds'] for probe in probes]
+        results.append({
+            'module': module,
+            'median_seconds': statistics.median(seconds),
+            'min_seconds': min(seconds),
+            'loaded': probes[-1]['loaded'],
+        })
+        print(f"{module:<28} {statistics.median(seconds) * 1000:>8.0f} ms  "
+              f"{', '.join(probes[-1]['loaded'])}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of each entry point")
+    parser.add_argument('--modules', nargs='+', default=ENTRY_POINTS,
+                        help="modules to import (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument('--output', help="optional JSON results file")
+    args = parser.parse_args()
+
+    results = run(args.modules, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Synthetic personnel/DISC datasets for benchmarking.
+
+Rows follow the column schema of utils.data_loader.get_sample_data();
+behavioral columns draw from phrases in disc_analyzer.get_disc_insights()
+for the row's DISC profile, so value distributions correlate with the
+profile the way real assessments do. Company attributes are consistent
+per company_id. Everything is generated with vectorized NumPy, in chunks
+when writing large files.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from disc_analyzer import get_disc_insights
+from utils.data_loader import get_sample_data
+
+PROFILES = ['D', 'I', 'S', 'C']
+PROFILE_WEIGHTS = [0.22, 0.28, 0.30, 0.20]
+
+FIRST_NAMES = ['John', 'Jane', 'Maria', 'Mohammed', 'Wei', 'Olga', 'Pierre', 'Aiko', 'Carlos',
+               'Priya', 'Kwame', 'Sofia', 'Liam', 'Emma', 'Noah', 'Ava', 'Lucas', 'Mia']
+LAST_NAMES = ['Doe', 'Smith', 'Garcia', 'Khan', 'Wang', 'Ivanova', 'Dubois', 'Sato', 'Silva',
+              'Patel', 'Mensah', 'Rossi', 'Brown', 'Johnson', 'Miller', 'Davis', 'Lopez', 'Kim']
+PREFIXES = ['Mr.', 'Ms.', 'Mrs.', 'Dr.', 'Mx.']
+LOCATIONS = [
+    ('New York', 'NY', '100', 'United States', 'America/New_York'),
+    ('Chicago', 'IL', '606', 'United States', 'America/Chicago'),
+    ('Austin', 'TX', '787', 'United States', 'America/Chicago'),
+    ('Denver', 'CO', '802', 'United States', 'America/Denver'),
+    ('San Francisco', 'CA', '941', 'United States', 'America/Los_Angeles'),
+    ('Toronto', 'ON', 'M5V', 'Canada', 'America/Toronto'),
+    ('London', 'ENG', 'EC1', 'United Kingdom', 'Europe/London'),
+    ('Berlin', 'BE', '101', 'Germany', 'Europe/Berlin'),
+]
+STREETS = ['Main Street', 'Oak Avenue', 'Pine Road', 'Maple Drive', 'Cedar Lane', 'Elm Street']
+SOURCES = ['n8n_workflow', 'web_form', 'csv_import', 'referral', 'linkedin']
+INDUSTRIES = ['Technology', 'Finance', 'Healthcare', 'Retail', 'Manufacturing', 'Education', 'Consulting']
+COMPANY_SIZES = ['1-10', '11-50', '51-200', '201-500', '500-1000', '1000+']
+POSITIONS = ['Senior Manager', 'Engineer', 'Sales Representative', 'Director', 'Analyst',
+             'Team Lead', 'Account Executive', 'HR Specialist', 'Vice President']
+
+# Which get_disc_insights() lists feed each behavioral column
+BEHAVIOR_SOURCES = {
+    'disc_sales': 'strengths',
+    'disc_communication': 'traits',
+    'leadership_style': 'strengths',
+    'team_dynamics': 'traits',
+    'conflict_resolution': 'development',
+    'customer_service_approach': 'traits',
+    'decision_making_style': 'strengths',
+    'workplace_behavior': 'traits',
+    'hiring_and_recruitment': 'strengths',
+    'coaching_and_development': 'development',
+}
+
+
+def _behavior_pools(sample):
+    """Per-column, per-profile value pools, always including the sample's own value"""
+    pools = {}
+    for col, key in BEHAVIOR_SOURCES.items():
+        pools[col] = {
+            profile: np.array(get_disc_insights(profile)[key] + [sample[col]], dtype=object)
+            for profile in PROFILES
+        }
+    return pools
+
+
+def _dates(rng, n, start, end):
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    days = rng.integers(0, (end - start).astype(int), n)
+    return pd.Series(start + days).dt.strftime('%Y-%m-%d').to_numpy(object)
+
+
+def generate_dataset(n_rows, seed=0, row_offset=0, n_companies=None):
+    """DataFrame of n_rows raw (string) records with the sample data's columns"""
+    rng = np.random.default_rng(seed)
+    sample = get_sample_data().astype(str).iloc[0]
+    n_companies = n_companies or max(1, (n_rows + row_offset) // 25)
+    ids = np.arange(row_offset, row_offset + n_rows)
+
+    first = rng.choice(FIRST_NAMES, n_rows)
+    last = rng.choice(LAST_NAMES, n_rows)
+    location = rng.integers(0, len(LOCATIONS), n_rows)
+    city, state, postal, country, timezone = (np.array(values, dtype=object)[location]
+                                              for values in zip(*LOCATIONS))
+    profile = rng.choice(PROFILES, n_rows, p=PROFILE_WEIGHTS)
+
+    # Company attributes are drawn once per company, then looked up per row
+    company_rng = np.random.default_rng(12345)
+    company_industry = company_rng.choice(INDUSTRIES, n_companies)
+    company_size = company_rng.choice(COMPANY_SIZES, n_companies)
+    company_id = rng.integers(0, n_companies, n_rows)
+
+    first_s, last_s = pd.Series(first), pd.Series(last)
+    id_s = pd.Series(ids).astype(str)
+    company_s = pd.Series(company_id).astype(str)
+    data = {
+        'prefix': rng.choice(PREFIXES, n_rows),
+        'first_name': first,
+        'last_name': last,
+        'full_name': (first_s + ' ' + last_s).to_numpy(object),
+        'email': (first_s.str.lower() + '.' + last_s.str.lower() + id_s + '@company' + company_s + '.com').to_numpy(object),
+        'timezone': timezone,
+        'address_line_1': (pd.Series(rng.integers(1, 9999, n_rows)).astype(str) + ' '
+                           + pd.Series(rng.choice(STREETS, n_rows))).to_numpy(object),
+        'address_line_2': np.where(rng.random(n_rows) < 0.3,
+                                   'Apt ' + pd.Series(rng.integers(1, 40, n_rows)).astype(str).to_numpy(str), ''),
+        'city': city,
+        'state': state,
+        'postal_code': (pd.Series(postal) + pd.Series(rng.integers(10, 99, n_rows)).astype(str)).to_numpy(object),
+        'country': country,
+        'ip': ('10.' + pd.Series(rng.integers(0, 256, n_rows)).astype(str) + '.'
+               + pd.Series(rng.integers(0, 256, n_rows)).astype(str) + '.'
+               + pd.Series(rng.integers(1, 255, n_rows)).astype(str)).to_numpy(object),
+        'phone': ('+1-555-' + pd.Series(rng.integers(100, 999, n_rows)).astype(str) + '-'
+                  + pd.Series(rng.integers(1000, 9999, n_rows)).astype(str)).to_numpy(object),
+        'source': rng.choice(SOURCES, n_rows),
+        'date_of_birth': _dates(rng, n_rows, '1960-01-01', '2003-12-31'),
+        'company_id': company_id,
+        'disc_profile': profile,
+    }
+    for col, pools in _behavior_pools(sample).items():
+        values = np.empty(n_rows, dtype=object)
+        for p in PROFILES:
+            rows = profile == p
+            values[rows] = rng.choice(pools[p], rows.sum())
+        data[col] = values
+    data.update({
+        'industry': company_industry[company_id],
+        'position': rng.choice(POSITIONS, n_rows),
+        'company_size': company_size[company_id],
+        'website': ('https://company' + company_s + '.com').to_numpy(object),
+        'assessment_date': _dates(rng, n_rows, '2022-01-01', '2024-12-31'),
+    })
+    return pd.DataFrame(data, columns=list(sample.index))
+
+
+def write_csv(path, n_rows, seed=0, chunk_rows=500000):
+    """Write an n_rows dataset to path, generating it chunk by chunk"""
+    n_companies = max(1, n_rows // 25)
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = generate_dataset(min(chunk_rows, n_rows - start), seed=seed + i,
+                                 row_offset=start, n_companies=n_companies)
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic DISC personnel CSV")
+    parser.add_argument('rows', type=int, help="number of rows (1k to 5M are typical)")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 # Configuration settings for the Streamlit app
+import os
 
 # Default column configurations
 COLUMN_CONFIGS = {
@@ -36,3 +37,170 @@ AGGRID_THEMES = ['streamlit', 'alpine', 'balham', 'material']
 
 # Default refresh intervals (in seconds)
 REFRESH_INTERVALS = [10, 30, 60, 120, 300]
+
+# Fetch cache: seconds a parsed sheet is reused without revalidating,
+# the total DataFrame memory (bytes) kept across all cached sources, and
+# how long a source may go unused before it is evicted
+FETCH_CACHE_TTL = 30
+FETCH_CACHE_MAX_BYTES = 512 * 1024 * 1024
+FETCH_CACHE_IDLE_SECONDS = 30 * 60
+
+# Rows per chunk when streaming a CSV body with progress updates
+CSV_CHUNK_ROWS = 10000
+
+# Multi-source loading: concurrent fetches, and the column tagging each row
+# with the URL it came from ('source' already holds the lead source)
+MULTI_SOURCE_MAX_WORKERS = 8
+SOURCE_TAG_COLUMN = 'source_sheet'
+
+# Typed loading schema. Behavioral and company descriptors have only a
+# handful of distinct values and are held as pandas categoricals.
+CATEGORICAL_COLUMNS = COLUMN_CONFIGS['disc_profile']['columns'] + [
+    'industry', 'company_size', 'country', 'state', 'source', 'timezone',
+    SOURCE_TAG_COLUMN
+]
+DATE_COLUMNS = COLUMN_CONFIGS['dates']['columns']
+INTEGER_COLUMNS = ['company_id']
+
+# Incremental refresh: primary key used to diff successive loads, and the
+# columns whose value counts are maintained from the delta (the DISC
+# distributions come from the delta-maintained cube instead)
+DELTA_KEY_COLUMN = 'email'
+DELTA_AGGREGATE_COLUMNS = ['company_id']
+
+# Background refresh scheduler: how often an open dashboard checks for a
+# newly published data version, and how many refresh intervals a source
+# stays scheduled after the last session stopped watching it
+SCHEDULER_PICKUP_SECONDS = 5
+SCHEDULER_LEASE_INTERVALS = 3
+
+# HTTP fetch client: timeouts (seconds), retries on 429/5xx and connection
+# errors with exponential backoff, and keep-alive pool size per host
+FETCH_CONNECT_TIMEOUT = 5
+FETCH_READ_TIMEOUT = 60
+FETCH_MAX_RETRIES = 3
+FETCH_BACKOFF_SECONDS = 0.5
+FETCH_MAX_BACKOFF_SECONDS = 30
+FETCH_POOL_SIZE = 10
+FETCH_STATS_HISTORY = 100
+
+# On-disk columnar snapshots used to serve the last good copy of a source
+# right after a restart; pruned by total size and age. Temporary files of
+# writes that never finished (a killed process) are removed once older
+# than SNAPSHOT_STALE_TMP_SECONDS
+SNAPSHOT_DIR = os.environ.get('DISC_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots'))
+SNAPSHOT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+SNAPSHOT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+SNAPSHOT_STALE_TMP_SECONDS = 60 * 60
+
+# Server-side grid paging: row count above which only the visible page is
+# sent to the browser, selectable page sizes, and how many datasets keep
+# their cached sort permutations
+GRID_SERVER_SIDE_ROWS = 20000
+GRID_PAGE_SIZES = [50, 100, 250, 500]
+GRID_ENGINE_CACHE_SIZE = 8
+
+# Exports: rows serialized per chunk, and total bytes of generated files
+# kept for repeat downloads
+EXPORT_CHUNK_ROWS = 50000
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# DISC aggregation cube dimensions and how many datasets keep a cached cube
+DISC_CUBE_DIMENSIONS = [
+    'disc_profile', 'leadership_style', 'team_dynamics', 'disc_communication',
+    'industry', 'company_size'
+]
+DISC_CUBE_CACHE_SIZE = 8
+
+# People search: indexed columns, how many index segments are kept before
+# they are merged, and how many frames keep an index
+SEARCH_COLUMNS = ['full_name', 'first_name', 'last_name', 'email', 'position', 'industry', 'city']
+SEARCH_MAX_SEGMENTS = 8
+SEARCH_INDEX_CACHE_SIZE = 8
+
+# Diagnostics: rolling JSON-lines log of per-stage timings (rotated at
+# INSTRUMENTATION_LOG_MAX_BYTES, keeping INSTRUMENTATION_LOG_BACKUPS old
+# files) and an optional Prometheus text-format file rewritten after each run
+INSTRUMENTATION_LOG_PATH = os.environ.get('DISC_STAGE_LOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.diagnostics', 'stages.jsonl'))
+INSTRUMENTATION_LOG_MAX_BYTES = 10 * 1024 * 1024
+INSTRUMENTATION_LOG_BACKUPS = 3
+PROMETHEUS_TEXTFILE = os.environ.get('DISC_PROMETHEUS_TEXTFILE')
+
+# Row-level validation: accepted DISC profile codes, the (deliberately
+# loose) e-mail shape, and how many per-dataset reports are kept
+VALID_DISC_PROFILES = ['D', 'I', 'S', 'C']
+EMAIL_PATTERN = r'[^@\s]+@[^@\s]+\.[^@\s]+'
+VALIDATION_CACHE_SIZE = 8
+
+# Duplicate detection: pairs scoring at least DEDUP_SIMILARITY_THRESHOLD
+# are merged; blocks (rows sharing a blocking key) larger than
+# DEDUP_MAX_BLOCK_SIZE are not compared pairwise, which keeps the stage
+# near-linear; DEDUP_NAME_PREFIX characters of the last name go into keys
+DEDUP_SIMILARITY_THRESHOLD = 0.8
+DEDUP_MAX_BLOCK_SIZE = 50
+DEDUP_NAME_PREFIX = 3
+DEDUP_CACHE_SIZE = 8
+
+# Column projection: the groups the loader parses on their own (the
+# COLUMN_CONFIGS groups plus OTHER_COLUMN_GROUP for every column none of
+# them lists), the groups always parsed because validation, dedup and the
+# incremental diff need them, the extra groups the data summary needs,
+# and those quarantine and duplicate merging need (assessment_date rules,
+# company_id blocking, newest-record selection)
+OTHER_COLUMN_GROUP = 'other'
+COLUMN_GROUPS = list(COLUMN_CONFIGS) + [OTHER_COLUMN_GROUP]
+CORE_COLUMN_GROUPS = ['personal_info', 'disc_profile']
+SUMMARY_COLUMN_GROUPS = ['company']
+CLEANING_COLUMN_GROUPS = ['company', 'dates']
+
+# Adaptive grid rendering: above GRID_COMPACT_ROWS rows sent to the
+# browser, the long DISC behavior columns render as fixed-height truncated
+# cells with a per-row detail pane (GRID_DETAIL_ROW_HEIGHT pixels) instead
+# of wrapped, auto-sized cells
+GRID_COMPACT_ROWS = 2000
+GRID_DETAIL_ROW_HEIGHT = 360
+GRID_RENDER_MODES = ['Auto', 'Wrapped text', 'Compact']
+
+# Grid round-trip: every row sent to the browser carries its position in
+# the server-held frame in this hidden column; the grid returns only these
+# ids (plus its filter and sort model), never the row data
+GRID_ROW_ID_COLUMN = '__row_id'
+
+# Team composition: the columns teams can be grouped by, the smallest team
+# ranked by balance (a one-person team is trivially unbalanced), how many
+# teams the rankings show and how many datasets keep their composition
+TEAM_GROUPINGS = {'Company': 'company_id', 'Industry': 'industry'}
+TEAM_MIN_SIZE = 3
+TEAM_TOP_N = 10
+TEAM_COMPOSITION_CACHE_SIZE = 8
+
+# Similar-profiles lookup: the categorical behavior columns people are
+# compared on, the default number of matches, the most people a group
+# query may select, and how many datasets keep their encoded matrix.
+# Batch queries match SIMILARITY_BATCH_ROWS people against
+# SIMILARITY_BATCH_COLUMNS rows at a time, sized so the (queries x rows)
+# block stays in cache
+SIMILARITY_COLUMNS = COLUMN_CONFIGS['disc_profile']['columns']
+SIMILARITY_TOP_K = 10
+SIMILARITY_MAX_QUERY_ROWS = 1000
+SIMILARITY_CACHE_SIZE = 8
+SIMILARITY_BATCH_ROWS = 64
+SIMILARITY_BATCH_COLUMNS = 16384
+
+# Headless batch reports: worker processes (default: one per CPU), where
+# reports are written and the value-count columns every report includes
+REPORT_MAX_WORKERS = os.cpu_count() or 1
+REPORT_OUTPUT_DIR = 'reports'
+REPORT_DISTRIBUTION_COLUMNS = ['industry', 'company_size', 'source']
+
+# Memory-bounded loading: a load whose CSV text would exceed
+# MEMORY_LIMIT_BYTES (env DISC_MEMORY_LIMIT_MB) is abandoned and the sheet
+# is streamed instead, keeping exact aggregates plus a uniform sample of
+# at most BOUNDED_SAMPLE_ROWS rows. Unique companies are estimated with a
+# HyperLogLog sketch of 2**BOUNDED_HLL_PRECISION registers ('exact' keeps
+# every id instead); summaries of BOUNDED_CACHE_SIZE samples are kept
+MEMORY_LIMIT_BYTES = int(os.environ.get('DISC_MEMORY_LIMIT_MB', 512)) * 1024 * 1024
+BOUNDED_SAMPLE_ROWS = 50000
+BOUNDED_UNIQUE_COMPANIES = 'sketch'
+BOUNDED_HLL_PRECISION = 14
+BOUNDED_CACHE_SIZE = 8
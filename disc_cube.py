@@ -0,0 +1,97 @@
+"""
+Single-pass DISC aggregation cube.
+
+One groupby over the cube dimensions yields the row count of every
+observed combination; per-column distributions, cross-tabs and
+drill-downs are then answered by summing slices of that (small) cube
+instead of rescanning the rows.
+"""
+
+import pandas as pd
+
+from config import DISC_CUBE_CACHE_SIZE, DISC_CUBE_DIMENSIONS
+from utils.frame_cache import FrameCache
+
+
+class DiscCube:
+    """Counts per combination of the DISC cube dimensions present in a frame"""
+
+    def __init__(self, counts, dimensions):
+        self.counts = counts
+        self.dimensions = dimensions
+        self._distributions = {}
+
+    @classmethod
+    def from_frame(cls, df, dimensions=DISC_CUBE_DIMENSIONS):
+        dimensions = [col for col in dimensions if col in df.columns]
+        return cls(cls._count(df, dimensions), dimensions)
+
+    @staticmethod
+    def _count(df, dimensions):
+        if not dimensions:
+            return pd.Series([len(df)], dtype='int64', name='count')
+        # Plain object keys so cubes from differently-categorized frames align
+        keys = [df[col].astype(object) for col in dimensions]
+        return df.groupby(keys, dropna=False).size().rename('count')
+
+    def update(self, added=None, removed=None):
+        """New cube with added/removed rows applied, without recounting the rest.
+
+        The cube itself is left as it is: it may still be the cached cube
+        of the frame it was built from.
+        """
+        counts = self.counts
+        if removed is not None and len(removed):
+            counts = counts.sub(self._count(removed, self.dimensions), fill_value=0)
+        if added is not None and len(added):
+            counts = counts.add(self._count(added, self.dimensions), fill_value=0)
+        return DiscCube(counts[counts > 0].astype('int64'), self.dimensions)
+
+    def _slice(self, where):
+        counts = self.counts
+        for col, value in (where or {}).items():
+            counts = counts[counts.index.get_level_values(col) == value]
+        return counts
+
+    def distribution(self, column, where=None):
+        """value_counts() of column (missing values dropped), optionally within a drill-down"""
+        if column not in self.dimensions:
+            return None
+        if where is None and column in self._distributions:
+            return self._distributions[column]
+        counts = self._slice(where)
+        if len(self.dimensions) > 1:
+            counts = counts.groupby(level=column, dropna=True).sum()
+        else:
+            counts = counts[counts.index.notna()]
+        counts = counts[counts > 0].sort_values(ascending=False)
+        counts.index.name = column
+        counts = counts.rename('count')
+        if where is None:
+            self._distributions[column] = counts
+        return counts
+
+    def crosstab(self, rows, columns, where=None):
+        """Counts of rows x columns as a DataFrame, optionally within a drill-down"""
+        counts = self._slice(where).groupby(level=[rows, columns]).sum()
+        return counts.unstack(columns, fill_value=0)
+
+    def drill_down(self, where):
+        """Sub-cube restricted to dimension values, e.g. {'disc_profile': 'D'}"""
+        return DiscCube(self._slice(where), self.dimensions)
+
+    def total(self):
+        return int(self.counts.sum())
+
+
+_cubes = FrameCache(max_entries=DISC_CUBE_CACHE_SIZE)
+
+
+def register_cube(df, cube):
+    """Make cube the cached cube for df (used by incremental refresh)"""
+    _cubes.put(df, cube)
+
+
+def cube_for(df):
+    """Cached cube for df, built on first use"""
+    return _cubes.get_or_build(df, lambda: DiscCube.from_frame(df))
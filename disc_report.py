@@ -0,0 +1,272 @@
+"""
+Headless batch DISC reporting across many sheets.
+
+Each source (a CSV file, every CSV in a directory, or a CSV / Google
+Sheets URL) is loaded, structure- and row-validated, analyzed with
+disc_analyzer.analyze_disc_profile and summarized in its own worker
+process. One report per source plus a rollup merging all of them are
+written as JSON and/or Parquet; no Streamlit session is involved.
+
+    python -m disc_report clients/ https://example.com/sheet.csv \\
+        --output-dir reports --format json parquet --workers 8
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from config import (
+    MEMORY_LIMIT_BYTES, REPORT_DISTRIBUTION_COLUMNS, REPORT_MAX_WORKERS, REPORT_OUTPUT_DIR
+)
+from disc_analyzer import analyze_disc_profile
+from disc_cube import register_cube
+from utils.bounded import MemoryLimitExceeded, bounded_summary_for, parse_bounded
+from utils.data_loader import load_data_from_url, parse_csv_stream, validate_data_structure
+from utils.exports import HAS_PYARROW
+from utils.fetch_cache import default_cache
+from utils.validation import ValidationReport
+
+REPORT_FORMATS = ['json', 'parquet']
+
+
+def expand_sources(sources):
+    """URLs and files as given, directories replaced by their CSV files"""
+    expanded = []
+    for source in sources:
+        if re.match(r'https?://', source) or not os.path.isdir(source):
+            expanded.append(source)
+        else:
+            expanded.extend(
+                os.path.join(source, name) for name in sorted(os.listdir(source))
+                if name.lower().endswith('.csv')
+            )
+    return expanded
+
+
+def load_source(source):
+    """(DataFrame, error) for a URL or a local CSV file
+
+    Files past the memory ceiling are streamed again in memory-bounded
+    mode, as load_data_from_url does for URLs.
+    """
+    if re.match(r'https?://', source):
+        return load_data_from_url(source)
+    try:
+        try:
+            with open(source, 'rb') as f:
+                return parse_csv_stream(f, max_bytes=MEMORY_LIMIT_BYTES), None
+        except MemoryLimitExceeded:
+            with open(source, 'rb') as f:
+                df = parse_bounded(f, MEMORY_LIMIT_BYTES)
+            summary = bounded_summary_for(df)
+            if summary is not None:
+                register_cube(df, summary.cube)
+            return df, None
+    except Exception as e:
+        return None, f"Error loading data: {str(e)}"
+
+
+def _counts(series):
+    """value_counts as a plain {value: count} dict"""
+    if series is None:
+        return {}
+    return {str(value): int(count) for value, count in series.items()}
+
+
+def report_source(source):
+    """Report dict for one source; runs in a worker process"""
+    start = time.perf_counter()
+    report = {'source': source, 'status': 'ok', 'error': None}
+    df, error = load_source(source)
+    if df is None:
+        report.update(status='error', error=error, seconds=time.perf_counter() - start)
+        return report
+
+    valid, message = validate_data_structure(df)
+    bounded = bounded_summary_for(df)
+    report.update({
+        'rows': bounded.rows if bounded else len(df),
+        'columns': len(df.columns),
+        'structure_valid': valid,
+        'structure_message': message,
+        # Past the memory ceiling only a sample is held: DISC counts and
+        # rows stay exact, validation and distributions cover the sample
+        'sampled_rows': bounded.sample_rows if bounded else None,
+    })
+    if not valid:
+        report['status'] = 'invalid'
+
+    validation = ValidationReport(df)
+    report['invalid_rows'] = int(validation.invalid_mask.sum())
+    report['rule_violations'] = {
+        row['rule']: int(row['violations']) for row in validation.summary().to_dict('records')
+    }
+
+    analysis = analyze_disc_profile(df) or {}
+    report['disc'] = {name: _counts(counts) for name, counts in analysis.items()}
+    report['distributions'] = {
+        col: _counts(df[col].value_counts()) for col in REPORT_DISTRIBUTION_COLUMNS if col in df.columns
+    }
+    if bounded:
+        report['unique_companies'] = bounded.unique_companies
+    else:
+        report['unique_companies'] = int(df['company_id'].nunique()) if 'company_id' in df.columns else 0
+    if 'assessment_date' in df.columns and df['assessment_date'].notna().any():
+        dates = pd.to_datetime(df['assessment_date'], errors='coerce')
+        report['assessment_dates'] = {'first': str(dates.min().date()), 'last': str(dates.max().date())}
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def _merge_counts(dicts):
+    merged = {}
+    for counts in dicts:
+        for value, count in counts.items():
+            merged[value] = merged.get(value, 0) + count
+    return dict(sorted(merged.items(), key=lambda item: -item[1]))
+
+
+def rollup(reports):
+    """Totals across the reports that loaded and passed structure validation
+
+    Sources that failed either check are listed but left out of every total.
+    """
+    valid = [report for report in reports if report['status'] == 'ok']
+    dates = [report['assessment_dates'] for report in valid if 'assessment_dates' in report]
+    return {
+        'sources': len(reports),
+        'loaded': sum(report['status'] != 'error' for report in reports),
+        'valid': len(valid),
+        'failed': [report['source'] for report in reports if report['status'] == 'error'],
+        'invalid_structure': [report['source'] for report in reports if report['status'] == 'invalid'],
+        'rows': sum(report['rows'] for report in valid),
+        'invalid_rows': sum(report['invalid_rows'] for report in valid),
+        'rule_violations': _merge_counts(report['rule_violations'] for report in valid),
+        # Company ids are per client sheet, so the per-source counts add up
+        'unique_companies': sum(report['unique_companies'] for report in valid),
+        'assessment_dates': {
+            'first': min(d['first'] for d in dates), 'last': max(d['last'] for d in dates)
+        } if dates else None,
+        'disc': {
+            name: _merge_counts(report['disc'].get(name, {}) for report in valid)
+            for name in sorted({name for report in valid for name in report['disc']})
+        },
+        'distributions': {
+            col: _merge_counts(report['distributions'].get(col, {}) for report in valid)
+            for col in REPORT_DISTRIBUTION_COLUMNS
+            if any(col in report['distributions'] for report in valid)
+        },
+    }
+
+
+def summary_frame(reports):
+    """One row of scalar statistics per source"""
+    scalar = (str, int, float, bool, type(None))
+    return pd.DataFrame([
+        {key: value for key, value in report.items() if isinstance(value, scalar)}
+        for report in reports
+    ])
+
+
+def counts_frame(reports):
+    """Long table of every value count: source, section, column, value, count"""
+    rows = [
+        {'source': report['source'], 'section': section, 'column': column, 'value': value, 'count': count}
+        for report in reports
+        for section in ('disc', 'distributions', 'rule_violations')
+        for column, counts in (
+            report.get(section, {}).items() if section != 'rule_violations'
+            else [('rule', report.get(section, {}))]
+        )
+        for value, count in counts.items()
+    ]
+    return pd.DataFrame(rows, columns=['source', 'section', 'column', 'value', 'count'])
+
+
+def _slug(source):
+    name = source.rstrip('/').rsplit('/', 1)[-1] or source
+    return re.sub(r'[^0-9A-Za-z._-]+', '_', os.path.splitext(name)[0])[:60] or 'source'
+
+
+def write_reports(reports, output_dir, formats):
+    """Write per-source reports and the rollup; return the written paths"""
+    os.makedirs(output_dir, exist_ok=True)
+    merged = rollup(reports)
+    written = []
+    if 'json' in formats:
+        for i, report in enumerate(reports):
+            path = os.path.join(output_dir, f"{i:04d}_{_slug(report['source'])}.json")
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            written.append(path)
+        path = os.path.join(output_dir, 'rollup.json')
+        with open(path, 'w') as f:
+            json.dump(merged, f, indent=2)
+        written.append(path)
+    if 'parquet' in formats:
+        tables = {
+            'sources.parquet': summary_frame(reports),
+            'counts.parquet': counts_frame(reports),
+            'rollup.parquet': counts_frame([dict(merged, source='rollup')]),
+        }
+        for name, table in tables.items():
+            path = os.path.join(output_dir, name)
+            table.to_parquet(path, index=False)
+            written.append(path)
+    return written
+
+
+def _init_worker():
+    # Each worker loads its sources once, so a snapshot would never be read
+    # back, and the pool could exit while one is still being written
+    default_cache.snapshots = None
+
+
+def run(sources, workers=REPORT_MAX_WORKERS):
+    """Report every source in a process pool; reports come back in source order"""
+    reports = [None] * len(sources)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(sources))), initializer=_init_worker) as pool:
+        futures = {pool.submit(report_source, source): i for i, source in enumerate(sources)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                reports[i] = future.result()
+            except Exception as e:
+                reports[i] = {'source': sources[i], 'status': 'error', 'error': str(e)}
+            report = reports[i]
+            detail = f"{report['rows']:,} rows" if 'rows' in report else report['error']
+            print(f"[{report['status']:>7}] {report['source']}: {detail}", file=sys.stderr)
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch DISC reports for CSV files, directories and URLs")
+    parser.add_argument('sources', nargs='+', help="CSV files, directories of CSV files or CSV/Google Sheets URLs")
+    parser.add_argument('--output-dir', default=REPORT_OUTPUT_DIR, help="report directory (default: %(default)s)")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=['json'],
+                        help="report formats (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=REPORT_MAX_WORKERS,
+                        help="worker processes (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if 'parquet' in args.format and not HAS_PYARROW:
+        parser.error("Parquet reports need pyarrow")
+
+    sources = expand_sources(args.sources)
+    if not sources:
+        parser.error("no CSV sources found")
+    start = time.perf_counter()
+    reports = run(sources, args.workers)
+    written = write_reports(reports, args.output_dir, args.format)
+    failed = sum(report['status'] == 'error' for report in reports)
+    print(f"{len(sources)} sources ({failed} failed) in {time.perf_counter() - start:.1f}s; "
+          f"wrote {len(written)} files to {args.output_dir}")
+    return 1 if failed == len(sources) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Team composition analytics per company or industry.
+
+One groupby over (team, disc_profile, leadership_style,
+conflict_resolution) counts every observed combination for all teams at
+once; the per-team D/I/S/C shares, dominant leadership style, conflict
+resolution mix and balance score are all derived from those counts, so
+rankings and per-team drill-downs never rescan the rows.
+
+The balance score is the normalized entropy of a team's D/I/S/C shares:
+1 for an even mix of all four profiles, 0 for a team with a single
+profile.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import TEAM_COMPOSITION_CACHE_SIZE, TEAM_MIN_SIZE, VALID_DISC_PROFILES
+from disc_analyzer import get_disc_insights
+from utils.frame_cache import FrameCache
+
+ATTRIBUTES = ['disc_profile', 'leadership_style', 'conflict_resolution']
+
+
+def _dominant(counts):
+    """Most frequent value per team (level 0) of a (team, value) count Series"""
+    counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+    top = counts[~counts.index.get_level_values(0).duplicated()]
+    return pd.Series(top.index.get_level_values(1), index=top.index.get_level_values(0))
+
+
+class TeamComposition:
+    """DISC composition of every team in a frame, grouped by one column"""
+
+    def __init__(self, counts, by):
+        self.counts = counts
+        self.by = by
+        self.table = self._table()
+
+    @classmethod
+    def from_frame(cls, df, by):
+        attributes = [col for col in ATTRIBUTES if col in df.columns]
+        keys = [df[by]] + [df[col] for col in attributes]
+        counts = df.groupby(keys, dropna=False, observed=True).size().rename('count')
+        # Rows without a team don't belong to any team
+        counts = counts[counts.index.get_level_values(0).notna()]
+        return cls(counts, by)
+
+    def _level_counts(self, column):
+        """(team, column value) counts, missing values dropped"""
+        if column not in self.counts.index.names:
+            return None
+        return self.counts.groupby(level=[self.by, column], observed=True).sum()
+
+    def _table(self):
+        team_size = self.counts.groupby(level=self.by, observed=True).sum()
+        table = pd.DataFrame({'team_size': team_size})
+
+        profiles = self._level_counts('disc_profile')
+        if profiles is not None:
+            profiles = profiles.unstack(fill_value=0).reindex(
+                index=table.index, columns=VALID_DISC_PROFILES, fill_value=0
+            )
+            profiled = profiles.sum(axis=1)
+            shares = profiles.div(profiled.where(profiled > 0), axis=0)
+            table['profiled'] = profiled
+            for profile in VALID_DISC_PROFILES:
+                table[profile] = shares[profile]
+            table['dominant_profile'] = profiles.idxmax(axis=1).where(profiled > 0)
+            values = shares.to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                entropy = -np.nansum(np.where(values > 0, values * np.log(values), 0.0), axis=1)
+            table['balance'] = np.where(profiled > 0, entropy / np.log(len(VALID_DISC_PROFILES)), np.nan)
+
+        for column in ('leadership_style', 'conflict_resolution'):
+            counts = self._level_counts(column)
+            if counts is None:
+                continue
+            dominant = _dominant(counts)
+            table[f'dominant_{column}'] = dominant.reindex(table.index)
+            if column == 'conflict_resolution':
+                styles = counts[counts > 0].groupby(level=self.by, observed=True).size()
+                table['conflict_resolution_styles'] = styles.reindex(table.index, fill_value=0)
+        return table
+
+    def ranked(self, n, most_balanced=True, min_size=TEAM_MIN_SIZE):
+        """Top n teams of at least min_size people by balance score"""
+        if 'balance' not in self.table.columns:
+            return self.table.iloc[:0]
+        teams = self.table[(self.table['team_size'] >= min_size) & self.table['balance'].notna()]
+        return teams.sort_values(
+            ['balance', 'team_size'], ascending=[not most_balanced, False], kind='stable'
+        ).head(n)
+
+    def drill_down(self, team):
+        """Composition of one team: its summary row and per-attribute value counts"""
+        if team not in self.table.index:
+            return None
+        counts = self.counts.xs(team, level=self.by, drop_level=True)
+        detail = {'summary': self.table.loc[team]}
+        for column in ATTRIBUTES:
+            if column not in self.counts.index.names:
+                continue
+            if len(counts.index.names) > 1:
+                values = counts.groupby(level=column, observed=True).sum()
+            else:
+                values = counts[counts.index.notna()]
+            values = values[values > 0].sort_values(ascending=False)
+            values.index.name = column
+            detail[column] = values.rename('count')
+        if 'disc_profile' in detail:
+            detail['profile_names'] = {
+                profile: get_disc_insights(profile).get('name', 'Unknown')
+                for profile in detail['disc_profile'].index
+            }
+        return detail
+
+
+_compositions = FrameCache(max_entries=TEAM_COMPOSITION_CACHE_SIZE)
+
+
+def composition_for(df, by):
+    """Cached TeamComposition of df grouped by column by, built on first use"""
+    if by not in df.columns:
+        return None
+    return _compositions.get_or_build(df, lambda: TeamComposition.from_frame(df, by), key=by)
@@ -0,0 +1,67 @@
+import http.server
+import threading
+
+import pytest
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+        route = server.routes.get(self.path)
+        if route is None:
+            status, headers, body = 404, {}, b''
+        else:
+            status, headers, body = route(self)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # The client gave up (e.g. a read timeout test)
+            pass
+
+
+class LocalServer:
+    """Local stand-in for the sheet export, like the one the benchmarks use.
+
+    routes maps a path to handler(request) -> (status, headers, body);
+    requests lists the (path, headers) of every GET received.
+    """
+
+    def __init__(self):
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.routes = {}
+        self._server.requests = []
+        self._server.lock = threading.Lock()
+        self.routes = self._server.routes
+        self.requests = self._server.requests
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._server.server_address[1]}{path}"
+
+    def count(self, path):
+        with self._server.lock:
+            return sum(1 for requested, _ in self.requests if requested == path)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    yield server
+    server.close()
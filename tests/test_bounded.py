@@ -0,0 +1,97 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.bounded import (
+    HyperLogLog, MemoryLimitExceeded, StreamingAggregator, _ExactUnique, bounded_summary_for
+)
+from utils.data_loader import load_data_from_url, parse_csv_stream
+
+
+def _csv(rows):
+    df = pd.DataFrame({
+        'first_name': [f'Person{i}' for i in range(rows)],
+        'last_name': 'Doe',
+        'email': [f'p{i}@example.com' for i in range(rows)],
+        'disc_profile': ['D', 'I', 'S', 'C'] * (rows // 4),
+        'company_id': [i % 50 for i in range(rows)],
+    })
+    return df, df.to_csv(index=False).encode()
+
+
+def test_parse_stops_once_the_text_passes_the_ceiling():
+    _, body = _csv(4000)
+
+    with pytest.raises(MemoryLimitExceeded):
+        parse_csv_stream(io.BytesIO(body), max_bytes=len(body) // 2)
+    assert len(parse_csv_stream(io.BytesIO(body), max_bytes=len(body))) == 4000
+
+
+def test_oversized_sheet_falls_back_to_an_exact_summary(http_server):
+    df, body = _csv(4000)
+    http_server.routes['/oversized.csv'] = lambda request: (200, {}, body)
+
+    sample, error = load_data_from_url(http_server.url('/oversized.csv'), memory_limit=len(body) // 2)
+
+    summary = bounded_summary_for(sample)
+    assert error is None
+    assert summary.rows == 4000
+    assert len(sample) < 4000
+
+
+@pytest.mark.parametrize('distinct', [100, 200_000])
+def test_hyperloglog_estimate_is_within_its_error(distinct):
+    sketch = HyperLogLog()
+    values = pd.Series(np.arange(distinct))
+    # Repeats must not count twice
+    sketch.add(values)
+    sketch.add(values[::2])
+
+    assert abs(sketch.estimate() - distinct) <= 3 * sketch.relative_error * distinct
+
+
+def test_exact_unique_matches_nunique():
+    counter = _ExactUnique()
+    values = pd.Series([1, 2, None, 2, 3])
+    counter.add(values)
+    counter.add(pd.Series([3, 4]))
+
+    assert counter.estimate() == 4
+
+
+def _stream(df, aggregator, chunksize=1000):
+    for start in range(0, len(df), chunksize):
+        aggregator.add(df.iloc[start:start + chunksize].reset_index(drop=True))
+    return aggregator.finish()
+
+
+def test_streaming_counts_are_exact_and_the_sample_is_real_rows():
+    df, _ = _csv(20_000)
+    aggregator = StreamingAggregator(memory_limit=10**9, sample_size=500, unique_method='exact', seed=1)
+
+    sample, summary = _stream(df, aggregator)
+
+    assert summary.rows == 20_000
+    assert summary.unique_companies == 50
+    pd.testing.assert_series_equal(
+        summary.cube.distribution('disc_profile').sort_index(),
+        df['disc_profile'].value_counts().rename('count').sort_index(),
+        check_index_type=False, check_categorical=False,
+    )
+    assert len(sample) == 500
+    assert sample.index.is_monotonic_increasing
+    assert (sample['email'].to_numpy() == df['email'].to_numpy()[sample.index]).all()
+
+
+def test_reservoir_sample_is_uniform_over_the_sheet():
+    df, _ = _csv(20_000)
+    quarters = np.zeros(4)
+    for seed in range(10):
+        aggregator = StreamingAggregator(memory_limit=10**9, sample_size=400, seed=seed)
+        sample, _ = _stream(df, aggregator, chunksize=2500)
+        quarters += np.bincount(sample.index // 5000, minlength=4)
+
+    # 4,000 draws: each quarter of the sheet should get about 1,000
+    assert (abs(quarters - 1000) < 150).all()
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from utils.data_loader import column_group, load_data_from_url
+from utils.schema import apply_schema
+
+CSV = (
+    b'first_name,city,email,disc_profile,company_id,notes\n'
+    b'Ada,London,ada@example.com,C,1,first\n'
+    b'Grace,Arlington,grace@example.com,D,2,second\n'
+)
+
+
+def _serve(http_server, path):
+    http_server.routes[path] = lambda request: (200, {}, CSV)
+    return http_server.url(path)
+
+
+def test_columns_are_grouped_by_config():
+    assert column_group('email') == 'personal_info'
+    assert column_group('company_id') == 'company'
+    assert column_group('notes') == 'other'
+
+
+def test_projection_holds_only_the_requested_groups(http_server):
+    url = _serve(http_server, '/projection.csv')
+
+    df, error = load_data_from_url(url, groups=['company', 'personal_info'])
+
+    assert error is None
+    assert list(df.columns) == ['first_name', 'email', 'company_id']
+    full = apply_schema(pd.read_csv(http_server.url('/projection.csv')))
+    pd.testing.assert_frame_equal(df, full[['first_name', 'email', 'company_id']], check_categorical=False)
+
+
+def test_adding_a_group_parses_only_that_group(http_server):
+    url = _serve(http_server, '/added.csv')
+
+    first, _ = load_data_from_url(url, groups=['personal_info'])
+    again, _ = load_data_from_url(url, groups=['personal_info'])
+    wider, _ = load_data_from_url(url, groups=['personal_info', 'disc_profile'])
+
+    assert again is first
+    assert list(wider.columns) == ['first_name', 'email', 'disc_profile']
+    assert wider['first_name'].tolist() == ['Ada', 'Grace']
+    assert http_server.count('/added.csv') == 2
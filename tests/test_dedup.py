@@ -0,0 +1,63 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from utils.dedup import DedupResult, _block_pairs, _similarity
+
+
+def _dice(a, b):
+    bigrams_a = [a[i:i + 2] for i in range(len(a) - 1)]
+    bigrams_b = [b[i:i + 2] for i in range(len(b) - 1)]
+    shared = sum(min(bigrams_a.count(bigram), bigrams_b.count(bigram)) for bigram in set(bigrams_a))
+    return 2 * shared / (len(bigrams_a) + len(bigrams_b))
+
+
+def test_blocks_yield_every_pair_within_a_block_only():
+    key = pd.Series(['x', 'y', 'x', '', 'x', 'y', 'z', 'big', 'big', 'big', 'big', ''])
+
+    a, b, oversized = _block_pairs(key, max_block=3)
+
+    expected = {
+        (i, j) for i, j in itertools.combinations(range(len(key)), 2)
+        if key[i] == key[j] and key[i] in ('x', 'y')
+    }
+    assert set(zip(a.tolist(), b.tolist())) == expected
+    assert len(a) == len(expected)
+    assert oversized == 1
+
+
+def test_similarity_is_the_bigram_dice_coefficient():
+    left = np.array(['jonathan smith', 'ada', 'grace', 'x', ''], dtype=object)
+    right = np.array(['jonathon smyth', 'ada', 'linus', 'x', ''], dtype=object)
+
+    scores = _similarity(left, right)
+
+    assert scores[1] == 1.0
+    assert scores[3] == 1.0
+    assert scores[4] == 0.0
+    # Hashed bigrams can only collide, never miss a shared bigram
+    assert scores[0] >= _dice(left[0], right[0]) and abs(scores[0] - _dice(left[0], right[0])) < 0.1
+    assert scores[2] >= _dice(left[2], right[2]) and scores[2] < 0.3
+
+
+def test_clusters_keep_each_persons_newest_row():
+    df = pd.DataFrame({
+        'first_name': ['Ada', 'Ada', 'Grace', 'ada', 'Linus', 'Grace'],
+        'last_name': ['Lovelace', 'Lovelace', 'Hopper', 'Lovelace', 'Torvalds', 'Hopper'],
+        'email': ['ada@example.com', 'ADA+work@example.com', 'grace@navy.mil',
+                  'ada.l@example.com', 'linus@kernel.org', 'grace.h@navy.mil'],
+        'phone': ['555-0199-000', '', '555-0100-200', '+1 555 0199 000', '', '(555) 0100200'],
+        'assessment_date': pd.to_datetime(['2024-01-01', '2024-03-01', None, '2024-02-01', '2024-01-01', '2023-01-01']),
+    })
+
+    result = DedupResult(df)
+
+    assert result.labels.tolist() == [0, 0, 2, 0, 4, 2]
+    # Ada's newest is March; Grace's only dated row wins over the missing date
+    assert sorted(result.keep.tolist()) == [1, 4, 5]
+    assert result.duplicates_removed == 3
+    assert result.duplicate_groups == 2
+    clusters = result.clusters()
+    assert clusters['kept'].sum() == 2
+    assert set(clusters.index) == {0, 1, 2, 3, 5}
@@ -0,0 +1,93 @@
+import pandas as pd
+
+from disc_cube import cube_for
+from utils.delta import IncrementalSnapshot
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=['email', 'disc_profile', 'company_id'])
+
+
+BASE = [
+    ('ada@example.com', 'D', 'c1'),
+    ('grace@example.com', 'I', 'c1'),
+    ('linus@example.com', 'S', 'c2'),
+]
+
+
+def test_first_load_is_a_full_rebuild():
+    snapshot = IncrementalSnapshot(key='email')
+
+    delta = snapshot.apply(_frame(BASE))
+
+    assert delta == {'inserted': 3, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'full_rebuild': True}
+
+
+def test_same_frame_is_all_unchanged():
+    snapshot = IncrementalSnapshot(key='email')
+    df = _frame(BASE)
+    snapshot.apply(df)
+
+    assert snapshot.apply(df) == {
+        'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 3, 'full_rebuild': False
+    }
+
+
+def test_counts_inserted_updated_deleted_and_unchanged_rows():
+    snapshot = IncrementalSnapshot(key='email')
+    snapshot.apply(_frame(BASE))
+
+    delta = snapshot.apply(_frame([
+        ('ada@example.com', 'D', 'c1'),
+        ('grace@example.com', 'C', 'c1'),
+        ('margaret@example.com', 'I', 'c3'),
+    ]))
+
+    assert delta == {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1, 'full_rebuild': False}
+
+
+def test_aggregates_and_cube_follow_the_delta():
+    snapshot = IncrementalSnapshot(key='email', aggregate_columns=['company_id'])
+    snapshot.apply(_frame(BASE))
+    changed = _frame([
+        ('ada@example.com', 'D', 'c1'),
+        ('grace@example.com', 'C', 'c2'),
+        ('margaret@example.com', 'I', 'c3'),
+    ])
+
+    snapshot.apply(changed)
+
+    assert snapshot.aggregates['company_id'].to_dict() == changed['company_id'].value_counts().to_dict()
+    assert snapshot.cube.distribution('disc_profile').to_dict() == {'D': 1, 'C': 1, 'I': 1}
+
+
+def test_repeated_keys_are_matched_by_occurrence():
+    snapshot = IncrementalSnapshot(key='email')
+    snapshot.apply(_frame(BASE + [('ada@example.com', 'I', 'c1')]))
+
+    delta = snapshot.apply(_frame(BASE + [('ada@example.com', 'S', 'c1')]))
+
+    assert delta['updated'] == 1
+    assert delta['unchanged'] == 3
+
+
+def test_changed_columns_force_a_rebuild():
+    snapshot = IncrementalSnapshot(key='email')
+    snapshot.apply(_frame(BASE))
+
+    delta = snapshot.apply(_frame(BASE).assign(industry='Finance'))
+
+    assert delta['full_rebuild'] is True
+    assert delta['inserted'] == 3
+
+
+def test_previous_frame_keeps_its_cube():
+    snapshot = IncrementalSnapshot(key='email')
+    old = _frame(BASE)
+    snapshot.apply(old)
+    new = _frame(BASE[:1])
+
+    snapshot.apply(new)
+
+    assert cube_for(old).total() == 3
+    assert cube_for(new).total() == 1
@@ -0,0 +1,43 @@
+import json
+
+import disc_report
+
+VALID = (
+    'first_name,last_name,email,disc_profile,company_id\n'
+    'Ada,Lovelace,ada@example.com,C,1\n'
+    'Grace,Hopper,grace@example.com,D,1\n'
+    'Linus,Torvalds,linus@example.com,D,2\n'
+)
+MISSING_PROFILE = 'first_name,last_name,email\nKen,Thompson,ken@example.com\n'
+
+
+def test_rollup_totals_only_validated_sources(tmp_path):
+    (tmp_path / 'a.csv').write_text(VALID)
+    (tmp_path / 'b.csv').write_text(MISSING_PROFILE)
+    sources = disc_report.expand_sources([str(tmp_path), str(tmp_path / 'absent.csv')])
+
+    merged = disc_report.rollup([disc_report.report_source(source) for source in sources])
+
+    assert merged['sources'] == 3
+    assert merged['loaded'] == 2
+    assert merged['valid'] == 1
+    assert merged['invalid_structure'] == [str(tmp_path / 'b.csv')]
+    assert merged['failed'] == [str(tmp_path / 'absent.csv')]
+    assert merged['rows'] == 3
+    assert merged['unique_companies'] == 2
+
+
+def test_main_writes_a_report_per_source_and_the_rollup(tmp_path):
+    sheets = tmp_path / 'sheets'
+    sheets.mkdir()
+    (sheets / 'one.csv').write_text(VALID)
+    (sheets / 'two.csv').write_text(VALID)
+    output = tmp_path / 'reports'
+
+    status = disc_report.main([str(sheets), '--output-dir', str(output), '--workers', '2'])
+
+    assert status == 0
+    assert sorted(path.name for path in output.iterdir()) == ['0000_one.json', '0001_two.json', 'rollup.json']
+    merged = json.loads((output / 'rollup.json').read_text())
+    assert merged['rows'] == 6
+    assert merged['disc']['profile_distribution'] == {'D': 4, 'C': 2}
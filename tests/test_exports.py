@@ -0,0 +1,52 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.exports import HAS_PYARROW, ExportCache, rows_digest, write_export
+
+
+def _frame():
+    return pd.DataFrame({'name': ['Ada', 'Grace', 'Linus'], 'score': [1.5, None, 3.0]})
+
+
+def test_chunked_csv_matches_to_csv():
+    df = _frame()
+
+    assert write_export(df, 'CSV', chunk_rows=2) == df.to_csv(index=False).encode()
+    assert gzip.decompress(write_export(df, 'CSV (gzip)', chunk_rows=1)) == df.to_csv(index=False).encode()
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason="Parquet needs pyarrow")
+def test_parquet_round_trips():
+    df = _frame()
+
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(write_export(df, 'Parquet'))), df)
+
+
+def test_digest_identifies_the_subset():
+    positions = np.array([0, 2])
+
+    assert rows_digest(positions) == rows_digest(np.array([0, 2]))
+    assert rows_digest(positions) != rows_digest(np.array([2, 0]))
+    assert rows_digest(_frame()) == rows_digest(_frame().copy())
+    assert rows_digest(_frame()) != rows_digest(_frame().iloc[:2])
+
+
+def test_files_are_built_once_per_subset_and_format():
+    df = _frame()
+    cache = ExportCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return df
+
+    download = cache.deferred(df, 'all', 'CSV', build)
+    assert builds == []
+    assert download() is download()
+    cache.get_or_build(df, 'all', 'CSV (gzip)', build)
+
+    assert len(builds) == 2
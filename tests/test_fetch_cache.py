@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from utils.fetch_cache import FetchCache, fetch_dataframe
+from utils.fetch_client import FetchClient
+from utils.instrumentation import StageRecorder
+
+CSV = b'first_name,email\nAda,ada@example.com\nGrace,grace@example.com\n'
+
+
+@pytest.fixture
+def cache():
+    return FetchCache(client=FetchClient(backoff=0.01), snapshots=None)
+
+
+def _etag_route(body, etag='"v1"'):
+    def route(request):
+        if request.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag}, body
+    return route
+
+
+def test_not_modified_reuses_the_cached_frame(http_server, cache):
+    http_server.routes['/sheet.csv'] = _etag_route(CSV)
+    url = http_server.url('/sheet.csv')
+
+    first = fetch_dataframe(url, pd.read_csv, cache)
+    second = fetch_dataframe(url, pd.read_csv, cache, max_age=0)
+
+    assert second is first
+    assert cache.stats['not_modified'] == 1
+    assert http_server.requests[-1][1]['If-None-Match'] == '"v1"'
+
+
+def test_fresh_entry_is_served_without_a_request(http_server, cache):
+    http_server.routes['/sheet.csv'] = _etag_route(CSV)
+    url = http_server.url('/sheet.csv')
+
+    first = fetch_dataframe(url, pd.read_csv, cache)
+    assert fetch_dataframe(url, pd.read_csv, cache) is first
+    assert http_server.count('/sheet.csv') == 1
+    assert cache.stats['hits'] == 1
+
+
+def test_unchanged_body_reuses_the_cached_frame(http_server, cache):
+    http_server.routes['/sheet.csv'] = lambda request: (200, {}, CSV)
+    url = http_server.url('/sheet.csv')
+
+    first = fetch_dataframe(url, pd.read_csv, cache)
+    second = fetch_dataframe(url, pd.read_csv, cache, max_age=0)
+
+    assert second is first
+    assert cache.stats['unchanged'] == 1
+
+
+def test_changed_body_replaces_the_frame(http_server, cache):
+    bodies = [CSV, CSV + b'Linus,linus@example.com\n']
+    http_server.routes['/sheet.csv'] = lambda request: (200, {}, bodies.pop(0))
+    url = http_server.url('/sheet.csv')
+
+    first = fetch_dataframe(url, pd.read_csv, cache)
+    second = fetch_dataframe(url, pd.read_csv, cache, max_age=0)
+
+    assert second is not first
+    assert len(second) == 3
+    assert cache.stats['misses'] == 2
+
+
+def test_stage_separates_network_from_parse_time(http_server, cache):
+    http_server.routes['/sheet.csv'] = lambda request: (200, {}, CSV)
+
+    with StageRecorder() as recorder:
+        fetch_dataframe(http_server.url('/sheet.csv'), pd.read_csv, cache)
+
+    record = recorder.records[0]
+    assert record['wire_bytes'] == record['bytes'] == len(CSV)
+    assert 0 < record['headers_seconds'] <= record['network_seconds'] <= record['seconds']
@@ -0,0 +1,100 @@
+import gzip
+import time
+
+import pytest
+import requests
+
+from utils.fetch_client import FetchClient
+
+
+def _client(**kwargs):
+    kwargs.setdefault('backoff', 0.01)
+    return FetchClient(**kwargs)
+
+
+def _flaky(statuses, body=b'ok', headers=None):
+    """Route answering with each of statuses in turn, then 200"""
+    remaining = list(statuses)
+
+    def route(request):
+        if remaining:
+            return remaining.pop(0), dict(headers or {}), b''
+        return 200, {}, body
+    return route
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_retryable_statuses(http_server, status):
+    http_server.routes['/sheet.csv'] = _flaky([status, status])
+    client = _client(max_retries=3)
+
+    with client.stream(http_server.url('/sheet.csv')) as response:
+        assert response.status_code == 200
+        assert response.content == b'ok'
+    assert client.last_stats()['attempts'] == 3
+    assert http_server.count('/sheet.csv') == 3
+
+
+def test_returns_last_response_when_retries_run_out(http_server):
+    http_server.routes['/sheet.csv'] = _flaky([503] * 5)
+    client = _client(max_retries=2)
+
+    with client.stream(http_server.url('/sheet.csv')) as response:
+        assert response.status_code == 503
+    assert http_server.count('/sheet.csv') == 3
+
+
+def test_does_not_retry_client_errors(http_server):
+    http_server.routes['/sheet.csv'] = _flaky([404])
+    client = _client(max_retries=3)
+
+    with client.stream(http_server.url('/sheet.csv')) as response:
+        assert response.status_code == 404
+    assert http_server.count('/sheet.csv') == 1
+
+
+def test_backoff_doubles_up_to_the_cap():
+    client = FetchClient(backoff=0.5, max_backoff=3)
+
+    assert [client._delay(attempt) for attempt in range(4)] == [0.5, 1.0, 2.0, 3]
+
+
+def test_retry_after_is_honoured(http_server):
+    http_server.routes['/sheet.csv'] = _flaky([429], headers={'Retry-After': '1'})
+    client = _client(max_retries=1, backoff=0)
+
+    start = time.perf_counter()
+    with client.stream(http_server.url('/sheet.csv')) as response:
+        assert response.status_code == 200
+    assert time.perf_counter() - start >= 1
+
+
+def test_read_timeout_is_retried_then_raised(http_server):
+    def slow(request):
+        time.sleep(0.5)
+        return 200, {}, b'late'
+    http_server.routes['/sheet.csv'] = slow
+    client = _client(read_timeout=0.1, max_retries=1)
+
+    with pytest.raises(requests.Timeout):
+        with client.stream(http_server.url('/sheet.csv')):
+            pass
+    assert client.last_stats()['attempts'] == 2
+    assert 'error' in client.last_stats()
+
+
+def test_gzip_body_is_decoded_while_streaming(http_server):
+    body = b'first_name,email\n' + b'Ada,ada@example.com\n' * 500
+    http_server.routes['/sheet.csv'] = lambda request: (
+        200, {'Content-Encoding': 'gzip'}, gzip.compress(body)
+    )
+    client = _client()
+
+    with client.stream(http_server.url('/sheet.csv')) as response:
+        response.raw.decode_content = True
+        assert response.raw.read() == body
+    headers = http_server.requests[-1][1]
+    assert 'gzip' in headers['Accept-Encoding']
+    stats = client.last_stats()
+    assert stats['content_encoding'] == 'gzip'
+    assert stats['wire_bytes'] < len(body)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from utils.grid_query import GridQueryEngine
+
+
+def _engine():
+    return GridQueryEngine(pd.DataFrame({
+        'name': ['Ada', 'Grace', 'Linus', 'Barbara', 'Ken', 'Margaret'],
+        'city': pd.Categorical(['Oslo', 'Lima', 'Oslo', 'Rome', 'Lima', 'Oslo']),
+        'age': [36, 85, 54, 83, 81, None],
+    }))
+
+
+def test_pages_follow_the_sort_with_missing_values_last():
+    engine = _engine()
+
+    first, total = engine.query(page=0, page_size=4, sort=('age', False))
+    second, _ = engine.query(page=1, page_size=4, sort=('age', False))
+
+    assert total == 6
+    assert first['name'].tolist() == ['Grace', 'Barbara', 'Ken', 'Linus']
+    assert second['name'].tolist() == ['Ada', 'Margaret']
+
+
+def test_filters_combine():
+    engine = _engine()
+
+    positions = engine.positions(filters={
+        'city': {'type': 'in', 'value': ['Oslo', 'Lima']},
+        'age': {'type': 'range', 'value': (50, None)},
+    })
+
+    assert positions.tolist() == [1, 2, 4]
+
+
+def test_rows_keep_the_callers_order_without_a_sort():
+    engine = _engine()
+    ranked = [5, 0, 3, 2]
+
+    assert engine.positions(rows=ranked).tolist() == ranked
+    assert engine.positions(filters={'city': {'type': 'in', 'value': ['Oslo']}}, rows=ranked).tolist() == [5, 0, 2]
+    assert engine.positions(sort=('name', True), rows=ranked).tolist() == [0, 3, 2, 5]
+
+
+def test_group_counts_cover_only_the_matching_rows():
+    engine = _engine()
+
+    counts = engine.group_counts(['city'], rows=np.array([0, 1, 2]))
+
+    assert dict(zip(counts['city'], counts['count'])) == {'Oslo': 2, 'Lima': 1}
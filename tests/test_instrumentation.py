@@ -0,0 +1,44 @@
+import os
+import threading
+
+from utils.instrumentation import StageRecorder, prometheus_text, stage, write_prometheus_textfile
+
+
+def test_stages_count_towards_totals_without_a_recorder():
+    with stage('test_unrecorded', rows=5):
+        pass
+
+    assert 'disc_stage_rows_total{stage="test_unrecorded"} 5' in prometheus_text()
+
+
+def test_recorder_collects_nested_stages():
+    with StageRecorder() as recorder:
+        with stage('test_outer'):
+            with stage('test_inner', rows=3):
+                pass
+
+    assert [(record['stage'], record['depth']) for record in recorder.records] == [
+        ('test_inner', 1), ('test_outer', 0)
+    ]
+    assert recorder.total_seconds() == recorder.records[1]['seconds']
+
+
+def test_concurrent_textfile_writes_do_not_collide(tmp_path):
+    path = str(tmp_path / 'disc.prom')
+    errors = []
+
+    def write():
+        for _ in range(50):
+            try:
+                write_prometheus_textfile(path)
+            except OSError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert os.listdir(tmp_path) == ['disc.prom']
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from config import SOURCE_TAG_COLUMN
+from utils.data_loader import load_data_from_urls
+
+HEADER = b'first_name,last_name,email,disc_profile,industry,company_id\n'
+FIRST = HEADER + b'Ada,Lovelace,ada@example.com,C,Tech,1\nGrace,Hopper,grace@example.com,D,Navy,2\n'
+SECOND = HEADER + (
+    b'Linus,Torvalds,linus@example.com,D,Tech,3\n'
+    b'Ken,Thompson,ken@example.com,S,Research,4\n'
+    b'Alan,Turing,alan@example.com,D,Research,5\n'
+)
+NO_PROFILE = b'first_name,email\nBarbara,barbara@example.com\n'
+
+
+def test_merged_counts_equal_the_sum_of_each_source(http_server):
+    http_server.routes['/first.csv'] = lambda request: (200, {}, FIRST)
+    http_server.routes['/second.csv'] = lambda request: (200, {}, SECOND)
+    urls = [http_server.url('/first.csv'), http_server.url('/second.csv')]
+
+    df, errors, frames = load_data_from_urls(urls)
+
+    assert errors == {}
+    assert len(df) == 5
+    assert df[SOURCE_TAG_COLUMN].tolist() == [urls[0]] * 2 + [urls[1]] * 3
+    for column in ('disc_profile', 'industry'):
+        # Each source infers its own categories; the merge must keep them all
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+        expected = frames[urls[0]][column].value_counts().add(
+            frames[urls[1]][column].value_counts(), fill_value=0
+        )
+        assert df[column].value_counts().sort_index().to_dict() == expected.sort_index().to_dict()
+
+
+def test_failed_and_invalid_sources_are_reported_and_left_out(http_server):
+    http_server.routes['/good.csv'] = lambda request: (200, {}, FIRST)
+    http_server.routes['/invalid.csv'] = lambda request: (200, {}, NO_PROFILE)
+    urls = [http_server.url(path) for path in ('/good.csv', '/invalid.csv', '/missing.csv')]
+
+    df, errors, frames = load_data_from_urls(urls)
+
+    assert len(df) == 2
+    assert list(frames) == [urls[0]]
+    assert set(errors) == {urls[1], urls[2]}
+    assert 'disc_profile' in errors[urls[1]]
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pandas as pd
+
+from utils.refresh_scheduler import RefreshScheduler
+
+INTERVAL = 0.05
+
+
+class FakeLoader:
+    """load_data_from_url stand-in returning queued frames, then the last one again"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.calls = []
+        self.loaded = threading.Event()
+
+    def __call__(self, url, max_age=None, groups=None):
+        self.calls.append((url, max_age, groups))
+        df = self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+        self.loaded.set()
+        return df, None
+
+
+def _watch_until(scheduler, url, condition, timeout=5, **kwargs):
+    """Keep watching url like a session rerunning would, until condition(version)"""
+    deadline = time.monotonic() + timeout
+    version = scheduler.watch(url, INTERVAL, 'session', **kwargs)
+    while not condition(version) and time.monotonic() < deadline:
+        time.sleep(INTERVAL / 5)
+        version = scheduler.watch(url, INTERVAL, 'session', **kwargs)
+    return version
+
+
+def test_version_bumps_when_the_loaded_frame_changes():
+    initial = pd.DataFrame({'email': ['a@example.com']})
+    changed = pd.DataFrame({'email': ['a@example.com', 'b@example.com']})
+    loader = FakeLoader([changed])
+    scheduler = RefreshScheduler(load=loader)
+
+    version = _watch_until(scheduler, 'http://sheet', lambda version: version > 0, df=initial)
+
+    assert version == 1
+    assert loader.calls[0] == ('http://sheet', 0, None)
+
+
+def test_version_stays_while_the_frame_is_unchanged():
+    df = pd.DataFrame({'email': ['a@example.com']})
+    loader = FakeLoader([df])
+    scheduler = RefreshScheduler(load=loader)
+
+    _watch_until(scheduler, 'http://sheet', lambda version: len(loader.calls) >= 3, df=df)
+
+    assert scheduler.status('http://sheet')[0] == 0
+
+
+def test_each_projection_is_its_own_source():
+    loader = FakeLoader([pd.DataFrame({'email': ['a@example.com']})])
+    scheduler = RefreshScheduler(load=loader)
+
+    version = _watch_until(
+        scheduler, 'http://sheet', lambda version: version > 0, groups=['personal_info']
+    )
+
+    assert version == 1
+    assert loader.calls[0] == ('http://sheet', 0, ('personal_info',))
+    assert scheduler.status('http://sheet')[0] == 0
+    assert scheduler.status('http://sheet', groups=['personal_info'])[0] == 1
+
+
+def test_worker_stops_once_every_lease_expires():
+    loader = FakeLoader([pd.DataFrame({'email': ['a@example.com']})])
+    scheduler = RefreshScheduler(load=loader, lease_intervals=2)
+
+    scheduler.watch('http://sheet', INTERVAL, 'session')
+    assert loader.loaded.wait(5)
+    deadline = time.monotonic() + 5
+    while scheduler._thread is not None and time.monotonic() < deadline:
+        time.sleep(INTERVAL)
+
+    assert scheduler._thread is None
+    assert scheduler.status('http://sheet') == (0, None, None)
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from utils.schema import apply_schema, coerced_values
+
+
+def test_dates_in_mixed_formats_are_all_parsed():
+    df = apply_schema(pd.DataFrame({'assessment_date': ['05 Feb 2024', '2024-01-05', '2024/03/07']}))
+
+    assert df['assessment_date'].tolist() == [
+        pd.Timestamp('2024-02-05'), pd.Timestamp('2024-01-05'), pd.Timestamp('2024-03-07')
+    ]
+    assert coerced_values(df) == {}
+
+
+def test_unparsable_values_are_counted():
+    df = apply_schema(pd.DataFrame({
+        'company_id': ['1', 'n/a', None, '3'],
+        'assessment_date': ['2024-01-05', 'soon', None, 'later'],
+    }))
+
+    assert df['company_id'].isna().sum() == 2
+    assert coerced_values(df) == {'company_id': 1, 'assessment_date': 2}
@@ -0,0 +1,75 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.search_index import SearchIndex, search_index_for, tokenize
+
+QUERIES = ['ada', 'LOVE', 'ada love', 'o', 'example', 'com ada', 'n/a', '', 'zzz', 'smith-jones', '42']
+
+
+def _people(n, seed=0):
+    rng = np.random.default_rng(seed)
+    first = rng.choice(['Ada', 'Grace', 'Linus', 'Adam', 'Olga', None], n)
+    last = rng.choice(['Lovelace', 'Hopper', 'Smith-Jones', "O'Neil", 'Loveless'], n)
+    return pd.DataFrame({
+        'first_name': first,
+        'last_name': last,
+        'email': [f'{f or "x"}.{i}@example.com'.lower() for i, f in enumerate(first)],
+        'city': pd.Categorical(rng.choice(['Oslo', 'Lima', 'New York', None], n)),
+    })
+
+
+def _reference(df, query):
+    """Rows where every term starts a token of some column, via str.contains"""
+    matched = pd.Series(True, index=df.index)
+    for term in tokenize(query):
+        pattern = r'(?<![0-9a-z])' + re.escape(term)
+        matched &= np.logical_or.reduce([
+            df[col].astype('string').str.lower().str.contains(pattern, regex=True).fillna(False).to_numpy(bool)
+            for col in df.columns
+        ])
+    return np.flatnonzero(matched.to_numpy())
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_matches_str_contains(query):
+    df = _people(500)
+
+    assert SearchIndex(df).search(query).tolist() == _reference(df, query).tolist()
+
+
+def test_appended_rows_are_indexed_on_top_of_the_previous_frame():
+    df = _people(600)
+    first = SearchIndex(df.iloc[:400])
+
+    index = SearchIndex(df, previous=first)
+
+    assert index.stats['mode'] == 'append'
+    assert index.stats['new_rows'] == 200
+    for query in QUERIES:
+        assert index.search(query).tolist() == _reference(df, query).tolist()
+
+
+def test_changed_rows_rebuild_the_index():
+    df = _people(400)
+    edited = df.copy()
+    edited.loc[10, 'first_name'] = 'Barbara'
+
+    index = SearchIndex(edited, previous=SearchIndex(df))
+
+    assert index.stats['mode'] == 'full'
+    assert 10 in index.search('barb').tolist()
+
+
+def test_each_frame_of_a_source_searches_its_own_rows():
+    df = _people(300)
+    subset = df.iloc[::2]
+
+    full_index = search_index_for('http://sheet', df)
+    subset_index = search_index_for('http://sheet', subset)
+
+    assert subset_index is not full_index
+    assert subset_index.df is subset
+    assert subset_index.search('ada').tolist() == _reference(subset, 'ada').tolist()
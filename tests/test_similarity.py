@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.similarity import SimilarityIndex
+
+COLUMNS = ['style', 'pace', 'focus']
+
+
+def _people(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        col: pd.Categorical(rng.choice(['a', 'b', 'c', None], n, p=[0.4, 0.3, 0.2, 0.1]))
+        for col in COLUMNS
+    })
+    df['name'] = [f'p{i}' for i in range(n)]
+    return df
+
+
+def _reference(df, position, k):
+    """Top k by shared known behaviors (ties to the earlier row), by brute force"""
+    values = df[COLUMNS].astype(object)
+    query = values.loc[position]
+    known = query.notna()
+    matches = (values == query).loc[:, known].sum(axis=1).to_numpy().copy()
+    matches[position] = 0
+    ranked = sorted((-count, row) for row, count in enumerate(matches) if count > 0)[:k]
+    rows = [row for _, row in ranked]
+    return rows, matches[rows] / max(known.sum(), 1)
+
+
+@pytest.mark.parametrize('position', [0, 7, 123])
+def test_top_k_matches_brute_force(position):
+    df = _people(400)
+    index = SimilarityIndex(df, columns=COLUMNS)
+
+    top, scores = index.top_k(position, k=15)
+
+    expected_rows, expected_scores = _reference(df, position, 15)
+    assert top.tolist() == expected_rows
+    np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_batch_matches_each_query(monkeypatch):
+    monkeypatch.setattr('utils.similarity.SIMILARITY_BATCH_ROWS', 4)
+    monkeypatch.setattr('utils.similarity.SIMILARITY_BATCH_COLUMNS', 64)
+    df = _people(300)
+    index = SimilarityIndex(df, columns=COLUMNS)
+    positions = [3, 0, 299, 42, 42, 17]
+
+    top, scores = index.top_k_batch(positions, k=5)
+
+    for i, position in enumerate(positions):
+        expected_rows, expected_scores = _reference(df, position, 5)
+        assert top[i, :len(expected_rows)].tolist() == expected_rows
+        assert (top[i, len(expected_rows):] == -1).all()
+        np.testing.assert_allclose(scores[i, :len(expected_rows)], expected_scores)
+
+
+def test_person_without_known_behaviors_matches_nobody():
+    df = pd.DataFrame({col: pd.Categorical([None, 'a', 'a']) for col in COLUMNS})
+    index = SimilarityIndex(df, columns=COLUMNS)
+
+    assert len(index.top_k(0)[0]) == 0
+    assert (index.top_k_batch([0])[0] == -1).all()
+
+
+def test_group_scores_are_the_shared_share_of_each_behavior():
+    df = pd.DataFrame({
+        'style': pd.Categorical(['a', 'a', 'b', 'a', 'b']),
+        'pace': pd.Categorical(['x', 'y', 'x', 'x', 'z']),
+    })
+    index = SimilarityIndex(df, columns=['style', 'pace'])
+
+    top, scores = index.similar_to_group([0, 1], k=3)
+
+    # Row 3 shares style with both members and pace with one: (1 + 1/2) / 2
+    assert top.tolist() == [3, 2]
+    np.testing.assert_allclose(scores, [0.75, 0.25])
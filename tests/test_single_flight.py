@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from utils.fetch_cache import FetchCache, fetch_dataframe
+from utils.fetch_client import FetchClient
+
+CSV = b'first_name,email\nAda,ada@example.com\nGrace,grace@example.com\n'
+
+
+class Interrupted(BaseException):
+    """Stands in for Streamlit's RerunException/StopException"""
+
+
+@pytest.fixture
+def cache():
+    return FetchCache(client=FetchClient(backoff=0.01), snapshots=None)
+
+
+def _run_threads(targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+
+def test_concurrent_fetches_share_one_request(http_server, cache):
+    def slow(request):
+        time.sleep(0.3)
+        return 200, {}, CSV
+    http_server.routes['/sheet.csv'] = slow
+    url = http_server.url('/sheet.csv')
+    results = []
+
+    _run_threads([lambda: results.append(fetch_dataframe(url, pd.read_csv, cache))] * 5)
+
+    assert len(results) == 5
+    assert all(df is results[0] for df in results)
+    assert http_server.count('/sheet.csv') == 1
+    assert cache.stats['coalesced'] == 4
+
+
+def test_waiters_share_the_leader_error(http_server, cache):
+    def slow(request):
+        time.sleep(0.3)
+        return 200, {}, CSV
+    http_server.routes['/sheet.csv'] = slow
+    url = http_server.url('/sheet.csv')
+    errors = []
+
+    def parse(stream):
+        raise ValueError('bad sheet')
+
+    def fetch():
+        try:
+            fetch_dataframe(url, parse, cache)
+        except ValueError as e:
+            errors.append(e)
+
+    _run_threads([fetch] * 3)
+
+    assert len(errors) == 3
+    assert all(error is errors[0] for error in errors)
+    assert http_server.count('/sheet.csv') == 1
+
+
+def test_cancelled_leader_hands_the_fetch_to_a_waiter(http_server, cache):
+    http_server.routes['/sheet.csv'] = lambda request: (200, {}, CSV)
+    url = http_server.url('/sheet.csv')
+    leader_parsing = threading.Event()
+    outcome = {}
+
+    def cancelled_parse(stream):
+        leader_parsing.set()
+        # Give the waiter time to join the flight before the leader is interrupted
+        time.sleep(0.3)
+        raise Interrupted()
+
+    def leader():
+        try:
+            fetch_dataframe(url, cancelled_parse, cache)
+        except Interrupted:
+            outcome['leader'] = 'interrupted'
+
+    def waiter():
+        leader_parsing.wait(5)
+        outcome['waiter'] = fetch_dataframe(url, pd.read_csv, cache)
+
+    _run_threads([leader, waiter])
+
+    assert outcome['leader'] == 'interrupted'
+    assert len(outcome['waiter']) == 2
+    assert http_server.count('/sheet.csv') == 2
+    assert cache.stats['coalesced'] == 0
+    assert not cache._inflight
@@ -0,0 +1,48 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from utils.snapshot_cache import SnapshotStore
+
+pytest.importorskip('pyarrow')
+
+
+def _touch(path, age):
+    with open(path, 'wb') as f:
+        f.write(b'partial')
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def test_round_trip(tmp_path):
+    store = SnapshotStore(directory=str(tmp_path))
+    df = pd.DataFrame({'email': ['a@example.com', 'b@example.com']})
+
+    store.save('http://sheet', df, 'hash1', etag='"v1"')
+    loaded, meta = store.load('http://sheet')
+
+    pd.testing.assert_frame_equal(loaded, df)
+    assert meta['etag'] == '"v1"'
+
+
+def test_prune_removes_stale_temporary_files_only(tmp_path):
+    store = SnapshotStore(directory=str(tmp_path), stale_tmp_age=60)
+    _touch(tmp_path / 'abc-1.feather.123.tmp', age=3600)
+    _touch(tmp_path / 'abc-1.json.123.tmp', age=3600)
+    _touch(tmp_path / 'abc-2.feather.456.tmp', age=0)
+
+    store.save('http://sheet', pd.DataFrame({'a': [1]}), 'hash1')
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.tmp')) == ['abc-2.feather.456.tmp']
+
+
+def test_wait_joins_background_saves(tmp_path):
+    store = SnapshotStore(directory=str(tmp_path))
+
+    store.save_in_background('http://sheet', pd.DataFrame({'a': range(1000)}), 'hash1')
+    store.wait()
+
+    assert store.load('http://sheet') is not None
+    assert not store._pending
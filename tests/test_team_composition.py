@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from team_composition import TeamComposition, composition_for
+
+
+def _frame():
+    return pd.DataFrame({
+        'company_id': [1, 1, 1, 1, 2, 2, 2, 3, None],
+        'disc_profile': ['D', 'I', 'S', 'C', 'D', 'D', None, 'S', 'C'],
+        'leadership_style': ['Directive', 'Coaching', 'Coaching', 'Directive', 'Directive', 'Directive', 'Coaching', 'Coaching', 'Directive'],
+        'conflict_resolution': ['Direct', 'Avoid', 'Direct', 'Direct', 'Direct', 'Direct', 'Avoid', None, 'Avoid'],
+    })
+
+
+def test_scores_match_a_per_team_recount():
+    df = _frame()
+
+    table = TeamComposition.from_frame(df, 'company_id').table
+
+    assert table.index.tolist() == [1, 2, 3]
+    assert table['team_size'].tolist() == [4, 3, 1]
+    assert table['profiled'].tolist() == [4, 2, 1]
+    # An even D/I/S/C mix scores 1, a single profile 0
+    assert table.loc[1, 'balance'] == pytest.approx(1.0)
+    assert table.loc[2, 'balance'] == pytest.approx(0.0)
+    assert table.loc[2, 'D'] == 1.0
+    assert table.loc[2, 'dominant_profile'] == 'D'
+    assert table.loc[2, 'dominant_leadership_style'] == 'Directive'
+    assert table.loc[1, 'conflict_resolution_styles'] == 2
+    assert table.loc[3, 'conflict_resolution_styles'] == 0
+
+
+def test_balance_is_normalized_entropy():
+    df = pd.DataFrame({'team': ['a'] * 4, 'disc_profile': ['D', 'D', 'I', 'S']})
+
+    balance = TeamComposition.from_frame(df, 'team').table.loc['a', 'balance']
+
+    shares = np.array([0.5, 0.25, 0.25])
+    assert balance == pytest.approx(-(shares * np.log(shares)).sum() / np.log(4))
+
+
+def test_ranking_skips_small_teams_and_drill_down_counts_one_team():
+    composition = composition_for(_frame(), 'company_id')
+
+    assert composition.ranked(10, min_size=2).index.tolist() == [1, 2]
+    assert composition.ranked(10, most_balanced=False, min_size=2).index.tolist() == [2, 1]
+    detail = composition.drill_down(2)
+    assert detail['disc_profile'].to_dict() == {'D': 2}
+    assert detail['conflict_resolution'].to_dict() == {'Direct': 2, 'Avoid': 1}
+    assert composition.drill_down(99) is None
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from utils.schema import apply_schema
+from utils.validation import ValidationReport, validate_rows
+
+
+def _frame():
+    return apply_schema(pd.DataFrame({
+        'first_name': ['Ada', None, 'Linus', 'Ken', 'Grace', 'Alan'],
+        'last_name': ['Lovelace', 'Hopper', 'Torvalds', 'Thompson', 'Hopper', 'Turing'],
+        'email': ['ada@example.com', 'grace@example', 'linus@kernel.org', 'ADA@Example.com', None, 'alan@example.com'],
+        'disc_profile': ['C', 'D', 'X', 'S', 'I', 'D'],
+        'assessment_date': ['2024-01-05', '2024-02-01', '2999-01-01', 'someday', '2024-03-01', '2024-04-01'],
+    }))
+
+
+def test_each_rule_flags_its_rows():
+    report = ValidationReport(_frame())
+
+    assert {rule: rows.tolist() for rule, rows in report.violations.items() if len(rows)} == {
+        'missing_first_name': [1],
+        'missing_email': [4],
+        'malformed_email': [1],
+        'duplicate_email': [3],
+        'unknown_disc_profile': [2],
+        'invalid_assessment_date': [3],
+        'future_assessment_date': [2],
+    }
+    assert report.invalid_rows == 4
+
+
+def test_valid_and_quarantined_frames_split_the_rows():
+    df = _frame()
+    report = validate_rows(df)
+
+    assert report.valid_frame()['first_name'].tolist() == ['Ada', 'Alan']
+    assert report.valid_frame() is report.valid_frame()
+    assert len(report.quarantined_frame()) == 4
+    assert validate_rows(df) is report
+
+
+def test_rules_for_absent_columns_are_skipped():
+    report = ValidationReport(pd.DataFrame({'email': ['a@example.com', 'a@example.com']}))
+
+    assert report.summary()['rule'].tolist() == ['missing_email', 'malformed_email', 'duplicate_email']
+    assert report.violations['duplicate_email'].tolist() == [1]
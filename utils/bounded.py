@@ -0,0 +1,233 @@
+"""
+Memory-bounded loading for sheets too large to hold in memory.
+
+The CSV is parsed one chunk at a time and every chunk is dropped once it
+has been folded into:
+
+- the DISC aggregation cube (exact counts for every cube dimension, so
+  distributions, cross-tabs and analyze_disc_profile stay exact),
+- the number of unique company ids, exact or as a HyperLogLog sketch of
+  fixed size,
+- a uniform reservoir sample of rows (Algorithm R) for the interactive
+  views, sized so one chunk plus the sample fit in the memory ceiling.
+
+The sample is returned as the loaded frame; its BoundedSummary (row
+totals, cube, unique companies) is found with bounded_summary_for().
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    BOUNDED_CACHE_SIZE, BOUNDED_HLL_PRECISION, BOUNDED_SAMPLE_ROWS, BOUNDED_UNIQUE_COMPANIES,
+    CSV_CHUNK_ROWS
+)
+from disc_cube import DiscCube
+from utils.frame_cache import FrameCache
+from utils.schema import apply_schema, concat_chunks, read_dtypes
+
+
+class MemoryLimitExceeded(Exception):
+    """A full load would need more memory than the configured ceiling"""
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+class HyperLogLog:
+    """Cardinality sketch of 2**precision one-byte registers (~1.04/sqrt(2**p) error)"""
+
+    def __init__(self, precision=BOUNDED_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+        width = 64 - self.precision
+        buckets = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << width) - 1)).astype(np.float64)
+        # rest < 2**53 is exact as a float, so frexp's exponent is its bit length
+        _, bit_length = np.frexp(rest)
+        ranks = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting is more accurate
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class _ExactUnique:
+    """Same interface as HyperLogLog, holding every distinct value"""
+
+    relative_error = 0.0
+
+    def __init__(self):
+        self.values = pd.Index([])
+
+    def add(self, values):
+        self.values = self.values.union(pd.Index(pd.Series(values).dropna().unique()))
+
+    def estimate(self):
+        return len(self.values)
+
+
+class BoundedSummary:
+    """Exact totals of a streamed sheet whose loaded frame is only a sample"""
+
+    def __init__(self, rows, columns, cube, unique_companies, unique_method,
+                 unique_error, sample_rows, memory_limit, peak_bytes):
+        self.rows = rows
+        self.columns = columns
+        self.cube = cube
+        self.unique_companies = unique_companies
+        self.unique_method = unique_method
+        self.unique_error = unique_error
+        self.sample_rows = sample_rows
+        self.memory_limit = memory_limit
+        self.peak_bytes = peak_bytes
+
+
+class StreamingAggregator:
+    """Folds parsed chunks into exact aggregates and a reservoir sample"""
+
+    def __init__(self, memory_limit, sample_size=BOUNDED_SAMPLE_ROWS,
+                 unique_method=BOUNDED_UNIQUE_COMPANIES, seed=None):
+        self.memory_limit = memory_limit
+        self.max_sample = sample_size
+        self.unique_method = unique_method
+        self.unique = HyperLogLog() if unique_method == 'sketch' else _ExactUnique()
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.columns = None
+        self.cube = None
+        self.peak_bytes = 0
+        self.k = None
+        self._pieces = []
+        self._piece_rows = 0
+        # Per reservoir slot: piece, row within the piece, sheet row number
+        self._slot_piece = None
+        self._slot_row = None
+        self._slot_source = None
+
+    def _sample_size(self, chunk, row_bytes):
+        """Reservoir size that, at twice its size (just before compaction)
+        next to one chunk, fits the memory ceiling"""
+        budget = self.memory_limit / row_bytes - len(chunk)
+        return int(min(self.max_sample, max(budget / 2, 1)))
+
+    def add(self, chunk):
+        chunk_bytes = frame_bytes(chunk)
+        row_bytes = max(chunk_bytes / max(len(chunk), 1), 1)
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.cube = DiscCube.from_frame(chunk)
+            self.k = self._sample_size(chunk, row_bytes)
+            self._slot_piece = np.zeros(self.k, dtype=np.int64)
+            self._slot_row = np.zeros(self.k, dtype=np.int64)
+            self._slot_source = np.full(self.k, -1, dtype=np.int64)
+        else:
+            self.cube = self.cube.update(added=chunk)
+        if 'company_id' in chunk.columns:
+            self.unique.add(chunk['company_id'])
+
+        # Algorithm R: sheet row i replaces a random slot with probability k/(i+1)
+        rows = self.rows + np.arange(len(chunk))
+        slots = np.where(rows < self.k, rows, self.rng.integers(0, rows + 1))
+        taken = np.flatnonzero(slots < self.k)
+        slots = slots[taken]
+        # A slot taken twice in this chunk keeps the later row
+        last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+        taken, slots = taken[last], slots[last]
+        if len(taken):
+            self._pieces.append(chunk.iloc[taken])
+            self._slot_piece[slots] = len(self._pieces) - 1
+            self._slot_row[slots] = np.arange(len(taken))
+            self._slot_source[slots] = rows[taken]
+            self._piece_rows += len(taken)
+        self.rows += len(chunk)
+
+        # Sampled rows are costed at this chunk's average row size
+        self.peak_bytes = max(self.peak_bytes, chunk_bytes + int(self._piece_rows * row_bytes))
+        if self._piece_rows > 2 * self.k:
+            self._compact()
+
+    def _compact(self):
+        """Replace the accumulated pieces with just the rows currently sampled"""
+        sample = self._sample()
+        self._pieces = [sample]
+        self._piece_rows = len(sample)
+        filled = self._slot_source >= 0
+        self._slot_piece[filled] = 0
+        self._slot_row[filled] = np.arange(int(filled.sum()))
+
+    def _sample(self):
+        filled = np.flatnonzero(self._slot_source >= 0)
+        offsets = np.cumsum([0] + [len(piece) for piece in self._pieces])
+        combined = concat_chunks(self._pieces) if len(self._pieces) > 1 else self._pieces[0]
+        return combined.iloc[offsets[self._slot_piece[filled]] + self._slot_row[filled]]
+
+    def finish(self):
+        """(sample frame in sheet order, indexed by sheet row, BoundedSummary)"""
+        if self.columns is None:
+            return pd.DataFrame(), None
+        order = np.argsort(self._slot_source[self._slot_source >= 0])
+        sample = self._sample().iloc[order]
+        sample.index = pd.RangeIndex(0, 0) if not len(sample) else pd.Index(
+            np.sort(self._slot_source[self._slot_source >= 0]), name='sheet_row'
+        )
+        summary = BoundedSummary(
+            rows=self.rows,
+            columns=len(self.columns),
+            cube=self.cube,
+            unique_companies=self.unique.estimate() if 'company_id' in self.columns else 0,
+            unique_method=self.unique_method,
+            unique_error=self.unique.relative_error,
+            sample_rows=len(sample),
+            memory_limit=self.memory_limit,
+            peak_bytes=self.peak_bytes,
+        )
+        return apply_schema(sample), summary
+
+
+def parse_bounded(stream, memory_limit, on_chunk=None, chunksize=CSV_CHUNK_ROWS):
+    """Stream a CSV through a StreamingAggregator; return its sample frame
+
+    The sample's BoundedSummary is registered for bounded_summary_for().
+    on_chunk(chunk, rows_loaded) fires after each chunk as in
+    parse_csv_stream.
+    """
+    aggregator = StreamingAggregator(memory_limit)
+    for chunk in pd.read_csv(stream, dtype=read_dtypes(), chunksize=chunksize):
+        aggregator.add(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk, aggregator.rows)
+    sample, summary = aggregator.finish()
+    if summary is not None:
+        register_summary(sample, summary)
+    return sample
+
+
+_summaries = FrameCache(max_entries=BOUNDED_CACHE_SIZE)
+
+
+def register_summary(df, summary):
+    _summaries.put(df, summary)
+
+
+def bounded_summary_for(df):
+    """BoundedSummary if df is the sample of a memory-bounded load, else None"""
+    return _summaries.get(df)
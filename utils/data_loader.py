@@ -1,29 +1,365 @@
 import pandas as pd
-import requests
-from io import StringIO
 import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    COLUMN_CONFIGS, COLUMN_GROUPS, CSV_CHUNK_ROWS, MEMORY_LIMIT_BYTES, MULTI_SOURCE_MAX_WORKERS,
+    OTHER_COLUMN_GROUP, SOURCE_TAG_COLUMN
+)
+from disc_cube import register_cube
+from utils.bounded import MemoryLimitExceeded, bounded_summary_for, parse_bounded
+from utils.fetch_cache import default_cache, fetch_dataframe
+from utils.instrumentation import stage
+from utils.schema import apply_schema, coerced_values, concat_chunks, read_dtypes
 
 def convert_gsheets_url(url):
-    """Convert Google Sheets sharing URL to CSV export URL"""
+    """Convert Google Sheets sharing URL to CSV export URL
+
+    The tab is kept when the URL names one (``#gid=...`` or ``?gid=...``).
+    """
     if 'docs.google.com/spreadsheets' in url:
         match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', url)
         if match:
             spreadsheet_id = match.group(1)
-            return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
+            csv_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
+            gid = re.search(r'[#?&]gid=(\d+)', url)
+            if gid:
+                csv_url += f"&gid={gid.group(1)}"
+            return csv_url
     return url
 
-def load_data_from_url(url):
-    """Load CSV data from URL"""
+class _ByteBudget:
+    """File-like wrapper raising MemoryLimitExceeded once more than max_bytes were read"""
+
+    def __init__(self, stream, max_bytes):
+        self._stream = stream
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_bytes:
+            raise MemoryLimitExceeded(
+                f"The sheet passed the {self.max_bytes / 2**20:,.0f} MB memory ceiling"
+            )
+        return data
+
+def parse_csv_stream(stream, on_chunk=None, chunksize=CSV_CHUNK_ROWS, usecols=None, max_bytes=None):
+    """Parse CSV from a binary file-like object without buffering the body.
+
+    Columns are typed per utils.schema while parsing; usecols (as for
+    pandas.read_csv) skips the others. When on_chunk is given the stream
+    is parsed chunksize rows at a time and on_chunk(chunk, rows_loaded) is
+    called after each chunk, so the caller can show the first rows while
+    the rest is still downloading. With max_bytes, MemoryLimitExceeded is
+    raised as soon as more than max_bytes of CSV text were read: a typed
+    frame takes about as much memory as its text, and counting bytes
+    costs nothing, unlike measuring every parsed chunk.
+    """
+    if max_bytes is not None:
+        stream = _ByteBudget(stream, max_bytes)
+    if on_chunk is None:
+        return apply_schema(pd.read_csv(stream, dtype=read_dtypes(), usecols=usecols))
+
+    chunks = []
+    rows_loaded = 0
+    for chunk in pd.read_csv(stream, dtype=read_dtypes(), chunksize=chunksize, usecols=usecols):
+        chunks.append(chunk)
+        rows_loaded += len(chunk)
+        on_chunk(chunk, rows_loaded)
+
+    if not chunks:
+        return pd.DataFrame()
+    return apply_schema(concat_chunks(chunks))
+
+def column_group(column):
+    """Name of the COLUMN_GROUPS group column belongs to"""
+    for group, config in COLUMN_CONFIGS.items():
+        if column in config['columns']:
+            return group
+    return OTHER_COLUMN_GROUP
+
+def _groups_key(csv_url, groups):
+    return f"{csv_url}#columns={'+'.join(groups)}"
+
+# (csv_url, group) -> (cache key, groups parsed under it); the frames
+# themselves live on the fetch cache entries
+_group_keys = {}
+_projection_lock = threading.Lock()
+
+def _load_column_groups(csv_url, groups, max_age=None, on_chunk=None, max_bytes=None):
+    """Frame of just the columns in groups, each group parsed and cached on its own.
+
+    Groups that aren't cached yet are parsed together in one request with
+    usecols limited to them; a cached group is revalidated under the key it
+    was parsed with, so adding a group later never re-parses the others.
+    If a revalidation shows the groups came from different versions of
+    the sheet, all of them are refreshed. The combined frame is kept on
+    the cache entry of the first group and reused as long as every source
+    frame is, so callers get the same object back while nothing changed;
+    it goes when that entry is evicted.
+    """
+    ttl = default_cache.ttl if max_age is None else max_age
+
+    def fetch(key_groups, age):
+        wanted = set(key_groups)
+        return fetch_dataframe(
+            csv_url,
+            lambda stream: parse_csv_stream(
+                stream, on_chunk=on_chunk, usecols=lambda column: column_group(column) in wanted,
+                max_bytes=max_bytes
+            ),
+            default_cache,
+            max_age=age,
+            key=_groups_key(csv_url, key_groups)
+        )
+
+    def collect(age):
+        # The cache key each group is parsed under, in group order
+        keys = {}
+        missing = []
+        for group in groups:
+            known = _group_keys.get((csv_url, group))
+            if known is not None and default_cache.get(known[0]) is not None:
+                keys[group] = known
+            else:
+                missing.append(group)
+        for group in missing:
+            keys[group] = (_groups_key(csv_url, missing), tuple(missing))
+
+        sources = {}
+        hashes = set()
+        for key, key_groups in dict(keys.values()).items():
+            source = fetch(key_groups, age)
+            entry = default_cache.get(key)
+            hashes.add(entry.content_hash if entry is not None else id(source))
+            sources[key] = (source, entry)
+        with _projection_lock:
+            for group in missing:
+                _group_keys[(csv_url, group)] = keys[group]
+        return keys, sources, len(hashes) <= 1
+
+    keys, sources, consistent = collect(ttl)
+    if not consistent:
+        keys, sources, _ = collect(0)
+
+    anchor = sources[keys[groups[0]][0]][1]
+    stamp = [(key, source) for key, (source, _) in sources.items()]
+    with _projection_lock:
+        cached = anchor.derived.get(('columns', groups)) if anchor is not None else None
+    if cached is not None and len(cached[0]) == len(stamp) and all(
+        key == old_key and ref() is source for (old_key, ref), (key, source) in zip(cached[0], stamp)
+    ):
+        return cached[1]
+
+    frames = []
+    for group in groups:
+        source = sources[keys[group][0]][0]
+        frames.append(source[[col for col in source.columns if column_group(col) == group]])
+    # Groups the sheet has no columns for parse to empty frames
+    present = [frame for frame in frames if len(frame.columns)] or frames[:1]
+    combined = pd.concat(present, axis=1) if len(present) > 1 else present[0]
+    if anchor is not None:
+        # Weak references, so the entry never pins another entry's frame
+        with _projection_lock:
+            anchor.derived[('columns', groups)] = (
+                [(key, weakref.ref(source)) for key, source in stamp], combined
+            )
+    return combined
+
+# Sources that once passed the memory ceiling; later loads (refreshes,
+# the background scheduler) stream them in bounded mode straight away
+_oversized = set()
+
+def _load_bounded(csv_url, memory_limit, max_age=None, on_chunk=None):
+    """Sample frame of a memory-bounded load, with its exact cube registered"""
+    key = f"{csv_url}#bounded={memory_limit}"
+
+    def fetch(age):
+        return fetch_dataframe(
+            csv_url,
+            lambda stream: parse_bounded(stream, memory_limit, on_chunk=on_chunk),
+            default_cache,
+            max_age=age,
+            key=key
+        )
+
+    df = fetch(max_age)
+    summary = bounded_summary_for(df)
+    if summary is None and len(df.columns):
+        # A sample restored from a disk snapshot, or one whose summary was
+        # evicted: only streaming the sheet again rebuilds the aggregates
+        default_cache.invalidate(key)
+        df = fetch(0)
+        summary = bounded_summary_for(df)
+    if summary is not None:
+        register_cube(df, summary.cube)
+    return df
+
+class _SessionCallback:
+    """Run a per-session on_chunk without letting it abort a shared parse.
+
+    The parse may be feeding other sessions waiting on the same fetch, so
+    an exception from the callback (a Streamlit rerun or stop raised by a
+    progress update, say) silences it instead; reraise() then raises it in
+    the calling session once the parse has been published.
+    """
+
+    def __init__(self, on_chunk):
+        self.on_chunk = on_chunk
+        self.interrupted = None
+
+    def __call__(self, chunk, rows_loaded):
+        if self.interrupted is None:
+            try:
+                self.on_chunk(chunk, rows_loaded)
+            except BaseException as e:
+                self.interrupted = e
+
+    def reraise(self):
+        if self.interrupted is not None:
+            raise self.interrupted
+
+def load_data_from_url(url, max_age=None, on_chunk=None, groups=None,
+                       memory_limit=MEMORY_LIMIT_BYTES, bounded=None):
+    """Load CSV data from URL.
+
+    Fetches go through the shared conditional-GET cache; the returned
+    frame may be shared with other sessions and must not be mutated.
+    max_age overrides the cache TTL (0 forces revalidation). on_chunk is
+    passed to parse_csv_stream and only fires when the body is parsed.
+    groups limits parsing to those COLUMN_GROUPS (in that order), each
+    cached separately; None loads every column.
+
+    A load whose CSV text passes memory_limit bytes is abandoned and
+    the sheet is streamed in memory-bounded mode instead (see
+    utils.bounded): the returned frame is then a uniform sample of every
+    column, and bounded_summary_for() gives the exact totals. bounded=True
+    always streams, bounded=False reports the overflow as an error, and
+    memory_limit=None disables the ceiling.
+    """
+    if on_chunk is not None:
+        on_chunk = _SessionCallback(on_chunk)
     try:
         csv_url = convert_gsheets_url(url)
-        response = requests.get(csv_url)
-        response.raise_for_status()
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
+        with stage('load_data_from_url') as record:
+            if bounded or (bounded is None and memory_limit is not None and csv_url in _oversized):
+                df = _load_bounded(csv_url, memory_limit or MEMORY_LIMIT_BYTES, max_age, on_chunk)
+            else:
+                try:
+                    if groups is None:
+                        df = fetch_dataframe(
+                            csv_url,
+                            lambda stream: parse_csv_stream(stream, on_chunk=on_chunk, max_bytes=memory_limit),
+                            default_cache,
+                            max_age=max_age
+                        )
+                    else:
+                        groups = tuple(group for group in COLUMN_GROUPS if group in groups)
+                        df = _load_column_groups(
+                            csv_url, groups, max_age=max_age, on_chunk=on_chunk, max_bytes=memory_limit
+                        )
+                except MemoryLimitExceeded:
+                    if bounded is False:
+                        raise
+                    _oversized.add(csv_url)
+                    df = _load_bounded(csv_url, memory_limit, max_age, on_chunk)
+            record['rows'] = len(df)
+            record['columns'] = len(df.columns)
+            record['bounded'] = bounded_summary_for(df) is not None
+        if on_chunk is not None:
+            on_chunk.reraise()
         return df, None
     except Exception as e:
         return None, str(e)
 
+def load_data_from_urls(urls, max_age=None, max_workers=MULTI_SOURCE_MAX_WORKERS, groups=None):
+    """Load several CSV sources concurrently and concatenate them.
+
+    Each source is validated with validate_data_structure; sources that
+    fail to load or validate are left out. Rows are tagged with the URL
+    they came from in SOURCE_TAG_COLUMN. Returns (df, errors, frames) where
+    errors maps each skipped URL to its message, df is None if nothing
+    loaded, and frames maps each loaded URL to the (shared, untagged) frame
+    load_data_from_url returned for it, e.g. as a refresh baseline.
+    groups is passed on to load_data_from_url. A sample can't be combined
+    with whole sheets, so sources past the memory ceiling are skipped.
+    """
+    def load_one(url):
+        df, error = load_data_from_url(url, max_age=max_age, groups=groups, bounded=False)
+        if df is not None:
+            is_valid, message = validate_data_structure(df)
+            if not is_valid:
+                return None, message
+        return df, error
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)) or 1) as pool:
+        results = list(pool.map(load_one, urls))
+
+    tagged = []
+    errors = {}
+    frames = {}
+    for url, (df, error) in zip(urls, results):
+        if df is None:
+            errors[url] = error
+            continue
+        frames[url] = df
+        # assign() returns a new frame, leaving the cached one untouched
+        tagged.append(df.assign(**{SOURCE_TAG_COLUMN: url}))
+
+    if not tagged:
+        return None, errors, frames
+    combined = concat_chunks(tagged)
+    coerced = {}
+    for df in frames.values():
+        for col, lost in coerced_values(df).items():
+            coerced[col] = coerced.get(col, 0) + lost
+    combined.attrs['coerced_values'] = coerced
+    return apply_schema(combined), errors, frames
+
+def get_sample_data():
+    """Create sample data with the provided example"""
+    sample_data = {
+        'prefix': ['Mr.'],
+        'first_name': ['John'],
+        'last_name': ['Doe'],
+        'full_name': ['John Doe'],
+        'email': ['john.doe@example.com'],
+        'timezone': ['America/New_York'],
+        'address_line_1': ['123 Main Street'],
+        'address_line_2': ['Apt 4B'],
+        'city': ['New York'],
+        'state': ['NY'],
+        'postal_code': ['10001'],
+        'country': ['United States'],
+        'ip': ['192.168.1.1'],
+        'phone': ['+1-555-123-4567'],
+        'source': ['n8n_workflow'],
+        'date_of_birth': ['1990-05-15'],
+        'company_id': ['123'],
+        'disc_profile': ['D'],
+        'disc_sales': ['High Performer'],
+        'disc_communication': ['Direct and Brief'],
+        'leadership_style': ['Transformational'],
+        'team_dynamics': ['Collaborative'],
+        'conflict_resolution': ['Mediation-Oriented'],
+        'customer_service_approach': ['Empathetic Listening'],
+        'decision_making_style': ['Data-Driven'],
+        'workplace_behavior': ['Proactive and Detail-Oriented'],
+        'hiring_and_recruitment': ['Culture-First'],
+        'coaching_and_development': ['Growth Mindset Focused'],
+        'industry': ['Technology'],
+        'position': ['Senior Manager'],
+        'company_size': ['500-1000'],
+        'website': ['https://example.com'],
+        'assessment_date': ['2024-01-15']
+    }
+    
+    return apply_schema(pd.DataFrame(sample_data))
+
 def validate_data_structure(df):
     """Validate that the DataFrame has the expected columns"""
     required_columns = [
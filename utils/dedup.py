@@ -0,0 +1,237 @@
+"""
+Duplicate detection and entity resolution for personnel records.
+
+E-mail, phone and names are normalized with vectorized string operations.
+Rows with the same normalized e-mail are the same person outright. Other
+candidates are only compared inside blocks, groups of rows sharing a
+blocking key (e-mail domain + last-name prefix + first initial,
+company_id + last-name prefix, normalized phone), so the number of
+comparisons grows with the number of rows rather than its square.
+Candidate pairs are scored on name and e-mail local part (bigram Dice
+similarity, computed with NumPy) and phone; pairs at or above the
+threshold are linked, linked rows form clusters, and each cluster keeps
+its newest row by assessment_date.
+"""
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from config import (
+    DEDUP_CACHE_SIZE, DEDUP_MAX_BLOCK_SIZE, DEDUP_NAME_PREFIX, DEDUP_SIMILARITY_THRESHOLD
+)
+from utils.frame_cache import FrameCache
+
+# Weights of the pair score; an identical normalized e-mail always scores 1
+NAME_WEIGHT = 0.5
+EMAIL_WEIGHT = 0.3
+PHONE_WEIGHT = 0.2
+
+# Strings are compared on their first SIMILARITY_WIDTH characters, with
+# character bigrams hashed into SIMILARITY_BUCKETS counters
+SIMILARITY_WIDTH = 32
+SIMILARITY_BUCKETS = 128
+SIMILARITY_CHUNK = 50000
+
+
+def _text(df, column):
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype='string')
+    return df[column].astype('string').fillna('')
+
+
+def normalize_email(series):
+    """Lower-cased, trimmed address with any +tag removed from the local part"""
+    emails = series.astype('string').str.strip().str.lower()
+    return emails.str.replace(r'\+[^@]*@', '@', regex=True).fillna('')
+
+
+def normalize_phone(series):
+    """Last ten digits of the number; empty when fewer than seven digits"""
+    digits = series.astype('string').str.replace(r'\D', '', regex=True).fillna('')
+    return digits.str[-10:].where(digits.str.len() >= 7, '')
+
+
+def normalize_name(series):
+    """Lower-case letters only"""
+    return series.astype('string').str.lower().str.replace(r'[^a-z]', '', regex=True).fillna('')
+
+
+def _block_pairs(key, max_block):
+    """All (a, b) row pairs, a < b, sharing a non-empty key in blocks of at most max_block rows"""
+    codes, _ = pd.factorize(key.where(key != ''))
+    valid = codes >= 0
+    sizes = np.bincount(codes[valid]) if valid.any() else np.zeros(0, dtype=np.int64)
+    size = np.zeros(len(codes), dtype=np.int64)
+    size[valid] = sizes[codes[valid]]
+    oversized = int((sizes > max_block).sum())
+
+    rows = np.flatnonzero((size >= 2) & (size <= max_block))
+    rows = rows[np.argsort(codes[rows], kind='stable')]
+    block = codes[rows]
+    first, second = [], []
+    # Rows of a block are adjacent after the sort, so comparing each row
+    # with the one k places ahead enumerates every pair within a block
+    for k in range(1, max_block):
+        same = block[k:] == block[:-k]
+        if not same.any():
+            break
+        first.append(rows[:-k][same])
+        second.append(rows[k:][same])
+    if not first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), oversized
+    return np.concatenate(first), np.concatenate(second), oversized
+
+
+def _bigram_counts(strings):
+    """Hashed character-bigram counts (rows x SIMILARITY_BUCKETS) and bigram totals"""
+    chars = np.asarray(strings, dtype=f'U{SIMILARITY_WIDTH}')
+    codes = chars.view(np.uint32).reshape(len(chars), SIMILARITY_WIDTH).astype(np.int64)
+    lengths = np.char.str_len(chars)
+    # Multiplicative (Fibonacci) hash of the packed bigram; top bits pick the bucket
+    packed = (codes[:, :-1] << 21) | codes[:, 1:]
+    buckets = ((packed * 2654435761) & 0xFFFFFFFF) * SIMILARITY_BUCKETS >> 32
+    valid = np.arange(SIMILARITY_WIDTH - 1) < (lengths - 1)[:, None]
+    flat = (np.arange(len(chars))[:, None] * SIMILARITY_BUCKETS + buckets)[valid]
+    counts = np.bincount(flat, minlength=len(chars) * SIMILARITY_BUCKETS)
+    return counts.reshape(len(chars), SIMILARITY_BUCKETS), valid.sum(axis=1)
+
+
+def _similarity(left, right):
+    """Bigram Dice coefficient per string pair, in [0, 1]; empty strings score 0"""
+    scores = np.zeros(len(left))
+    for start in range(0, len(left), SIMILARITY_CHUNK):
+        a = left[start:start + SIMILARITY_CHUNK]
+        b = right[start:start + SIMILARITY_CHUNK]
+        counts_a, total_a = _bigram_counts(a)
+        counts_b, total_b = _bigram_counts(b)
+        shared = np.minimum(counts_a, counts_b).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dice = np.where(total_a + total_b > 0, 2 * shared / (total_a + total_b), 0.0)
+        # Single characters have no bigrams; fall back to equality
+        equal = (a == b) & (a != '')
+        scores[start:start + len(a)] = np.where(equal, 1.0, dice)
+    return scores
+
+
+def _connected_components(n, a, b):
+    """Cluster label (lowest member position) for each of n rows linked by edges a-b"""
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        differ = la != lb
+        if not differ.any():
+            return labels
+        la, lb = la[differ], lb[differ]
+        # Hook the higher root under the lower one, then flatten the trees
+        np.minimum.at(labels, np.maximum(la, lb), np.minimum(la, lb))
+        while True:
+            flattened = labels[labels]
+            if np.array_equal(flattened, labels):
+                break
+            labels = flattened
+
+
+class DedupResult:
+    """Duplicate clusters of one DataFrame and its deduplicated view"""
+
+    def __init__(self, df, threshold=DEDUP_SIMILARITY_THRESHOLD, max_block=DEDUP_MAX_BLOCK_SIZE):
+        start = time.perf_counter()
+        self.df = df
+        n = len(df)
+        email = normalize_email(_text(df, 'email'))
+        phone = normalize_phone(_text(df, 'phone')).to_numpy(dtype=object)
+        first_name = normalize_name(_text(df, 'first_name'))
+        last_name = normalize_name(_text(df, 'last_name'))
+        name = (first_name + ' ' + last_name).to_numpy(dtype=object)
+        local = email.str.replace(r'@.*$', '', regex=True).to_numpy(dtype=object)
+        domain = email.str.replace(r'^[^@]*@?', '', regex=True)
+        prefix = last_name.str[:DEDUP_NAME_PREFIX]
+        has_prefix = prefix != ''
+
+        # Same normalized e-mail: link every row to the first with that address
+        email_codes, _ = pd.factorize(email.where(email != ''))
+        exact = email_codes >= 0
+        first_of = np.full(email_codes.max() + 1 if exact.any() else 0, n, dtype=np.int64)
+        positions = np.arange(n)
+        np.minimum.at(first_of, email_codes[exact], positions[exact])
+        exact_a, exact_b = positions[exact], first_of[email_codes[exact]]
+
+        # Fuzzy candidates within blocks
+        company = _text(df, 'company_id')
+        block_keys = [
+            (domain + '|' + prefix + '|' + first_name.str[:1]).where(has_prefix & (domain != ''), ''),
+            (company + '|' + prefix).where(has_prefix & (company != ''), ''),
+            pd.Series(phone, index=df.index, dtype='string').fillna(''),
+        ]
+        cand_a, cand_b, self.oversized_blocks = [], [], 0
+        for key in block_keys:
+            a, b, oversized = _block_pairs(key, max_block)
+            cand_a.append(a)
+            cand_b.append(b)
+            self.oversized_blocks += oversized
+        a = np.concatenate(cand_a)
+        b = np.concatenate(cand_b)
+        if len(a):
+            # One entry per unordered pair, skipping pairs the e-mail link covers
+            pair = np.sort(np.minimum(a, b) * n + np.maximum(a, b))
+            pair = pair[np.concatenate(([True], pair[1:] != pair[:-1]))]
+            a, b = pair // n, pair % n
+            email_values = email.to_numpy(dtype=object)
+            keep = email_values[a] != email_values[b]
+            a, b = a[keep], b[keep]
+        self.candidate_pairs = len(a)
+
+        score = (
+            NAME_WEIGHT * _similarity(name[a], name[b])
+            + EMAIL_WEIGHT * _similarity(local[a], local[b])
+            + PHONE_WEIGHT * ((phone[a] == phone[b]) & (phone[a] != ''))
+        ) if len(a) else np.zeros(0)
+        linked = score >= threshold
+        self.labels = _connected_components(
+            n, np.concatenate([exact_a, a[linked]]), np.concatenate([exact_b, b[linked]])
+        )
+
+        # Newest row per cluster; a missing date (NaT) counts as the oldest,
+        # and ties go to the later row
+        if 'assessment_date' in df.columns:
+            dates = pd.to_datetime(df['assessment_date'], errors='coerce').to_numpy('datetime64[ns]').view('int64')
+        else:
+            dates = np.zeros(n, dtype=np.int64)
+        order = np.lexsort((positions, dates, self.labels))
+        last = np.ones(n, dtype=bool)
+        last[:-1] = self.labels[order][1:] != self.labels[order][:-1]
+        self.keep = np.sort(order[last])
+
+        sizes = np.bincount(self.labels, minlength=n)
+        self.duplicate_groups = int((sizes > 1).sum())
+        self.duplicates_removed = n - len(self.keep)
+        self.seconds = time.perf_counter() - start
+        self._deduplicated = None
+        self._lock = threading.Lock()
+
+    def deduplicated(self):
+        """df with one (newest) row per person; the same object on every call"""
+        with self._lock:
+            if self._deduplicated is None:
+                self._deduplicated = self.df if self.duplicates_removed == 0 else self.df.iloc[self.keep]
+            return self._deduplicated
+
+    def clusters(self):
+        """Rows belonging to a duplicate cluster, grouped, with a cluster column"""
+        sizes = np.bincount(self.labels, minlength=len(self.labels))
+        members = np.flatnonzero(sizes[self.labels] > 1)
+        members = members[np.argsort(self.labels[members], kind='stable')]
+        kept = np.zeros(len(self.labels), dtype=bool)
+        kept[self.keep] = True
+        return self.df.iloc[members].assign(
+            cluster=self.labels[members], kept=kept[members]
+        )
+
+
+_results = FrameCache(max_entries=DEDUP_CACHE_SIZE)
+
+
+def find_duplicates(df):
+    """Shared DedupResult for df, computed once per dataset"""
+    return _results.get_or_build(df, lambda: DedupResult(df))
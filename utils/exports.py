@@ -0,0 +1,92 @@
+"""
+Lazy, memoized data exports.
+
+Download buttons get a callable instead of pre-rendered bytes, so nothing
+is serialized until someone actually clicks. Generated files are cached
+by (dataset, row subset, format) and reused until evicted. CSV is written
+in row chunks, optionally gzip-compressed; Parquet needs pyarrow.
+"""
+import gzip
+import hashlib
+import importlib.util
+import io
+
+import pandas as pd
+
+from config import EXPORT_CACHE_MAX_BYTES, EXPORT_CHUNK_ROWS
+from utils.frame_cache import FrameCache
+from utils.instrumentation import stage
+
+# Probed without importing; to_parquet imports pyarrow when it's used
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+EXPORT_FORMATS = {
+    'CSV': {'extension': 'csv', 'mime': 'text/csv'},
+    'CSV (gzip)': {'extension': 'csv.gz', 'mime': 'application/gzip'},
+    'Parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+}
+
+
+def available_formats():
+    """Export format names usable in this environment"""
+    return [name for name in EXPORT_FORMATS if name != 'Parquet' or HAS_PYARROW]
+
+
+def _write_csv(df, out, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        out.write(chunk.to_csv(index=False, header=start == 0).encode('utf-8'))
+
+
+def write_export(df, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Serialize df in the given EXPORT_FORMATS format and return the bytes"""
+    with stage('write_export', rows=len(df), format=fmt) as record:
+        buffer = io.BytesIO()
+        if fmt == 'CSV':
+            _write_csv(df, buffer, chunk_rows)
+        elif fmt == 'CSV (gzip)':
+            with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6) as out:
+                _write_csv(df, out, chunk_rows)
+        elif fmt == 'Parquet':
+            df.to_parquet(buffer, index=False)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        data = buffer.getvalue()
+        record['bytes'] = len(data)
+    return data
+
+
+def rows_digest(values):
+    """Short digest of a row subset (positions array or a frame's contents)"""
+    if isinstance(values, pd.DataFrame):
+        values = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+class ExportCache:
+    """LRU of generated export files, bounded by total size.
+
+    Files are cached per base frame and dropped when it is collected.
+    """
+
+    def __init__(self, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self._files = FrameCache(max_bytes=max_bytes, size=len)
+
+    def get_or_build(self, base_df, subset, fmt, build_frame):
+        """Bytes of build_frame() exported as fmt, memoized.
+
+        base_df identifies the data version (cached frames keep their
+        identity until the source changes) and subset names the row
+        selection within it, e.g. 'all' or a rows_digest.
+        """
+        return self._files.get_or_build(
+            base_df, lambda: write_export(build_frame(), fmt), key=(subset, fmt)
+        )
+
+    def deferred(self, base_df, subset, fmt, build_frame):
+        """Zero-argument callable for st.download_button(data=...)"""
+        return lambda: self.get_or_build(base_df, subset, fmt, build_frame)
+
+
+# Process-wide cache shared by every Streamlit session
+default_exports = ExportCache()
@@ -0,0 +1,306 @@
+"""
+Conditional-GET fetch cache for CSV sources.
+
+Entries are keyed on the converted CSV export URL and hold the parsed
+DataFrame together with the validators (ETag / Last-Modified) and a hash
+of the raw bytes, so a rerun can reuse the frame on a 304 or on an
+unchanged body instead of parsing the sheet again.
+
+The cache is process-wide: every session gets the same frame object, and
+concurrent fetches of one URL are coalesced into a single request whose
+result all callers share. Cached frames are shared read-only; callers
+that need to modify one must copy it first.
+
+Parsed frames are also persisted through utils.snapshot_cache, so after a
+restart the first request for a source is answered from disk while the
+source is revalidated in the background.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from config import FETCH_CACHE_IDLE_SECONDS, FETCH_CACHE_MAX_BYTES, FETCH_CACHE_TTL
+from utils.fetch_client import default_client
+from utils.instrumentation import stage
+from utils.snapshot_cache import default_snapshots
+
+
+class CacheEntry:
+    """A parsed DataFrame plus the validators needed to revalidate it"""
+
+    def __init__(self, url, df, content_hash, etag=None, last_modified=None):
+        self.url = url
+        self.df = df
+        self.content_hash = content_hash
+        self.etag = etag
+        self.last_modified = last_modified
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+        # Frames computed from df (e.g. column projections), dropped with the entry
+        self.derived = {}
+        self.validated_at = time.monotonic()
+        self.used_at = self.validated_at
+
+    def age(self):
+        return time.monotonic() - self.validated_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class _Flight:
+    """One in-progress fetch that concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.df = None
+        self.error = None
+        # Set when the leader was interrupted (e.g. a Streamlit rerun or
+        # stop) rather than failed; waiters then fetch again themselves
+        self.cancelled = False
+
+
+class FetchCache:
+    """Thread-safe LRU of parsed frames, bounded by total frame memory.
+
+    Entries not used for idle_seconds are dropped on the next insert even
+    when the memory budget isn't reached.
+    """
+
+    def __init__(self, ttl=FETCH_CACHE_TTL, max_bytes=FETCH_CACHE_MAX_BYTES,
+                 idle_seconds=FETCH_CACHE_IDLE_SECONDS, client=default_client,
+                 snapshots=default_snapshots):
+        self.client = client
+        self.snapshots = snapshots
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'not_modified': 0, 'unchanged': 0, 'misses': 0,
+                      'coalesced': 0, 'snapshot_restores': 0, 'evictions': 0}
+
+    def get(self, url):
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                entry.used_at = time.monotonic()
+            return entry
+
+    def put(self, entry):
+        with self._lock:
+            old = self._entries.pop(entry.url, None)
+            if old is not None:
+                self.total_bytes -= old.nbytes
+            if entry.nbytes > self.max_bytes:
+                # Larger than the whole budget: serve it, but don't keep it
+                return
+            self._entries[entry.url] = entry
+            self.total_bytes += entry.nbytes
+            self._evict()
+
+    def _evict(self):
+        """Drop LRU entries while over budget or idle; caller holds the lock"""
+        idle_before = time.monotonic() - self.idle_seconds
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if self.total_bytes <= self.max_bytes and oldest.used_at >= idle_before:
+                break
+            self._entries.popitem(last=False)
+            self.total_bytes -= oldest.nbytes
+            self.stats['evictions'] += 1
+
+    def invalidate(self, url=None):
+        """Drop one URL, or everything when no URL is given"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                self.total_bytes = 0
+            else:
+                entry = self._entries.pop(url, None)
+                if entry is not None:
+                    self.total_bytes -= entry.nbytes
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+
+class HashingReader:
+    """File-like wrapper that hashes bytes as the CSV parser pulls them"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._hash = hashlib.sha256()
+        self.bytes_read = 0
+        # Time spent waiting on the network, as opposed to parsing
+        self.read_seconds = 0.0
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = self._raw.read(size)
+        self.read_seconds += time.perf_counter() - start
+        self._hash.update(data)
+        self.bytes_read += len(data)
+        return data
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def fetch_dataframe(csv_url, parse, cache, max_age=None, key=None):
+    """Return the DataFrame for csv_url, revalidating through the cache.
+
+    The body is streamed: parse is called with a binary file-like object
+    and reads it incrementally. On a 304 nothing is downloaded; if the
+    body turns out byte-identical to the cached one, the freshly parsed
+    frame is dropped and the cached one is returned so callers keep a
+    stable object. max_age overrides the cache TTL for this call; pass 0
+    to force a (conditional) round trip.
+
+    If another thread is already fetching csv_url this call waits for it
+    and returns the same frame (or raises the same error) instead of
+    issuing a second request. If that fetch is cancelled by a
+    BaseException in its own thread, the waiters fetch again.
+
+    When nothing is cached in memory but a disk snapshot exists, the
+    snapshot is returned immediately and revalidated in the background
+    (unless max_age is 0, which always goes to the network).
+
+    key names the cache entry (and snapshot) when one URL is parsed in
+    several ways, e.g. into different column projections; it defaults to
+    csv_url.
+    """
+    key = key or csv_url
+    ttl = cache.ttl if max_age is None else max_age
+    while True:
+        entry = cache.get(key)
+        if entry is not None and entry.age() < ttl:
+            cache._count('hits')
+            return entry.df
+
+        with cache._lock:
+            flight = cache._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = cache._inflight[key] = _Flight()
+        if leader:
+            break
+
+        flight.done.wait()
+        if flight.cancelled:
+            # The leader gave up without a result; go round again and
+            # either find its successor's flight or lead the fetch
+            continue
+        cache._count('coalesced')
+        if flight.error is not None:
+            raise flight.error
+        return flight.df
+
+    restored = None
+    try:
+        if entry is None and max_age != 0:
+            restored = _restore_snapshot(key, cache)
+        if restored is not None:
+            flight.df = restored.df
+        else:
+            flight.df = _revalidate(csv_url, parse, cache, entry, key)
+        return flight.df
+    except Exception as e:
+        flight.error = e
+        raise
+    except BaseException:
+        # Control-flow exceptions (SystemExit, KeyboardInterrupt, Streamlit's
+        # RerunException/StopException) cancel this caller only
+        flight.cancelled = True
+        raise
+    finally:
+        with cache._lock:
+            del cache._inflight[key]
+        flight.done.set()
+        if restored is not None:
+            threading.Thread(
+                target=_revalidate_in_background, args=(csv_url, parse, cache, key), daemon=True
+            ).start()
+
+
+def _restore_snapshot(key, cache):
+    """Load the disk snapshot for key into the cache as a stale entry"""
+    if cache.snapshots is None:
+        return None
+    with stage('snapshot_restore') as record:
+        snapshot = cache.snapshots.load(key)
+        if snapshot is None:
+            return None
+        df, meta = snapshot
+        record['rows'] = len(df)
+    entry = CacheEntry(key, df, meta['content_hash'], meta.get('etag'), meta.get('last_modified'))
+    # Never fresh: the next fetch must revalidate it
+    entry.validated_at = float('-inf')
+    cache.put(entry)
+    cache._count('snapshot_restores')
+    return entry
+
+
+def _revalidate_in_background(csv_url, parse, cache, key):
+    try:
+        fetch_dataframe(csv_url, parse, cache, max_age=0, key=key)
+    except Exception:
+        # The snapshot keeps being served; the next foreground fetch
+        # retries and reports the error
+        pass
+
+
+def _revalidate(csv_url, parse, cache, entry, key):
+    """Conditional GET for csv_url against entry (which may be None), cached as key"""
+    headers = entry.conditional_headers() if entry is not None else {}
+    # The body is parsed while it streams in, so network and parse time are
+    # told apart by timing the response headers and every body read
+    start = time.perf_counter()
+    with stage('fetch_and_parse') as record, \
+            cache.client.stream(csv_url, headers=headers) as response:
+        record['status'] = response.status_code
+        record['headers_seconds'] = record['network_seconds'] = time.perf_counter() - start
+        if entry is not None and response.status_code == 304:
+            entry.validated_at = time.monotonic()
+            cache._count('not_modified')
+            return entry.df
+
+        response.raise_for_status()
+        # Let urllib3 undo any gzip/deflate transfer encoding while streaming
+        response.raw.decode_content = True
+        reader = HashingReader(response.raw)
+        df = parse(reader)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        record['rows'] = len(df)
+        record['bytes'] = reader.bytes_read
+        record['wire_bytes'] = response.raw.tell()
+        record['network_seconds'] += reader.read_seconds
+
+    content_hash = reader.hexdigest()
+    if entry is not None and entry.content_hash == content_hash:
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        entry.validated_at = time.monotonic()
+        cache._count('unchanged')
+        return entry.df
+
+    cache.put(CacheEntry(key, df, content_hash, etag, last_modified))
+    cache._count('misses')
+    if cache.snapshots is not None:
+        cache.snapshots.save_in_background(key, df, content_hash, etag, last_modified)
+    return df
+
+
+# Process-wide cache shared by every Streamlit session
+default_cache = FetchCache()
@@ -0,0 +1,121 @@
+"""
+Pooled HTTP client used for all CSV fetches.
+
+One keep-alive requests.Session is shared process-wide, so refreshes reuse
+TLS connections. Requests negotiate gzip/deflate, carry connect/read
+timeouts, and are retried with exponential backoff on 429/5xx responses
+and connection failures. Every fetch leaves a timing record in
+FetchClient.history. requests is imported when the first fetch is made,
+not when this module is imported.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import (
+    FETCH_BACKOFF_SECONDS, FETCH_CONNECT_TIMEOUT, FETCH_MAX_BACKOFF_SECONDS,
+    FETCH_MAX_RETRIES, FETCH_POOL_SIZE, FETCH_READ_TIMEOUT, FETCH_STATS_HISTORY
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchClient:
+    """Keep-alive session with timeouts, retries and per-fetch timing"""
+
+    def __init__(self, connect_timeout=FETCH_CONNECT_TIMEOUT, read_timeout=FETCH_READ_TIMEOUT,
+                 max_retries=FETCH_MAX_RETRIES, backoff=FETCH_BACKOFF_SECONDS,
+                 max_backoff=FETCH_MAX_BACKOFF_SECONDS, pool_size=FETCH_POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self._session = None
+        self.history = deque(maxlen=FETCH_STATS_HISTORY)
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['Accept-Encoding'] = 'gzip, deflate'
+                self._session = session
+            return self._session
+
+    def _delay(self, attempt, response=None):
+        """Backoff before retry number attempt, honouring a numeric Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return min(self.backoff * (2 ** attempt), self.max_backoff)
+
+    def _get(self, url, headers, stats):
+        import requests
+
+        attempt = 0
+        while True:
+            stats['attempts'] = attempt + 1
+            try:
+                response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+            attempt += 1
+
+    @contextmanager
+    def stream(self, url, headers=None):
+        """GET url with a streamed body; the response is closed on exit.
+
+        The timing record (attempts, status, seconds to headers, total
+        seconds including the caller's body read, bytes on the wire) is
+        appended to history when the block exits.
+        """
+        stats = {'url': url, 'started': time.time(), 'attempts': 0, 'status': None}
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._get(url, headers, stats)
+            stats['status'] = response.status_code
+            stats['headers_seconds'] = time.perf_counter() - start
+            stats['content_encoding'] = response.headers.get('Content-Encoding')
+            yield response
+        except Exception as e:
+            stats['error'] = str(e)
+            raise
+        finally:
+            if response is not None:
+                stats['wire_bytes'] = response.raw.tell()
+                response.close()
+            stats['total_seconds'] = time.perf_counter() - start
+            with self._lock:
+                self.history.append(stats)
+
+    def last_stats(self, url=None):
+        """Most recent timing record, optionally for a given URL"""
+        with self._lock:
+            for stats in reversed(self.history):
+                if url is None or stats['url'] == url:
+                    return dict(stats)
+        return None
+
+
+# Process-wide client shared by every Streamlit session
+default_client = FetchClient()
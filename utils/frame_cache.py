@@ -0,0 +1,102 @@
+"""
+Per-frame memo caches.
+
+Structures computed from a DataFrame (cubes, query engines, validation
+reports, ...) are cached per frame object so every session and rerun
+that holds the same frame reuses them. Entries hold only a weak
+reference to their frame: the cache never keeps a frame alive, and when
+a frame is collected its entries are dropped before its id can be
+handed out again. A value that itself references its frame still keeps
+it alive until the entry is evicted.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class FrameCache:
+    """Thread-safe LRU of values computed from DataFrames.
+
+    Values are keyed on the frame plus an optional key, for caches that
+    hold several values per frame. max_entries bounds the number of
+    entries; with max_bytes, the sum of size(value) is bounded instead,
+    and a value larger than max_bytes is returned but never kept.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, size=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._size = size or (lambda value: 0)
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._finalizers = {}
+        # Reentrant: a frame can be collected (running _drop_frame) while
+        # this thread already holds the lock
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, df, key=None):
+        """Cached value for df and key, or None"""
+        entry_key = (id(df), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or entry[0]() is not df:
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry[1]
+
+    def put(self, df, value, key=None):
+        """Cache value for df and key, evicting least recently used entries"""
+        entry_key = (id(df), key)
+        nbytes = self._size(value)
+        with self._lock:
+            self._discard(entry_key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            self._entries[entry_key] = (weakref.ref(df), value, nbytes)
+            self.total_bytes += nbytes
+            if id(df) not in self._finalizers:
+                finalizer = weakref.finalize(df, self._drop_frame, id(df))
+                finalizer.atexit = False
+                self._finalizers[id(df)] = finalizer
+            while self._over_budget():
+                self._discard(next(iter(self._entries)))
+
+    def get_or_build(self, df, build, key=None):
+        """Cached value for df and key, calling build() on a miss"""
+        value = self.get(df, key)
+        if value is None:
+            value = build()
+            self.put(df, value, key)
+        return value
+
+    def clear(self):
+        with self._lock:
+            for entry_key in list(self._entries):
+                self._discard(entry_key)
+
+    def _over_budget(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def _discard(self, entry_key):
+        """Drop one entry; caller holds the lock"""
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[2]
+        frame_id = entry_key[0]
+        if not any(other[0] == frame_id for other in self._entries):
+            finalizer = self._finalizers.pop(frame_id, None)
+            if finalizer is not None:
+                finalizer.detach()
+
+    def _drop_frame(self, frame_id):
+        # Runs when the frame is collected, before its id can be reused
+        with self._lock:
+            self._finalizers.pop(frame_id, None)
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == frame_id]:
+                self._discard(entry_key)
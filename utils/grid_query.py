@@ -0,0 +1,121 @@
+"""
+Server-side query engine for the data table.
+
+Sorting, filtering, grouping and paging run in pandas on the server so
+the browser grid only ever receives one page. Sort permutations are
+computed once per column and direction and reused for every page and
+filter combination of the same dataset.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import GRID_ENGINE_CACHE_SIZE
+from utils.frame_cache import FrameCache
+
+
+class GridQueryEngine:
+    """Pages, sorts, filters and groups one (read-only) DataFrame"""
+
+    def __init__(self, df):
+        self.df = df
+        self._sort_cache = {}
+        self._lock = threading.Lock()
+
+    def sort_permutation(self, column, ascending=True):
+        """Row positions of df ordered by column; missing values last"""
+        key = (column, ascending)
+        with self._lock:
+            perm = self._sort_cache.get(key)
+        if perm is None:
+            ordered = self.df[column].reset_index(drop=True).sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            )
+            perm = ordered.index.to_numpy()
+            with self._lock:
+                self._sort_cache[key] = perm
+        return perm
+
+    def filter_mask(self, filters):
+        """Boolean row mask for a filter model.
+
+        filters maps column name to a dict with 'type' and 'value':
+        'contains' (case-insensitive substring), 'equals', 'in' (list of
+        values) or 'range' ((low, high), either end may be None).
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, spec in (filters or {}).items():
+            if column not in self.df.columns:
+                continue
+            series = self.df[column]
+            kind, value = spec['type'], spec['value']
+            if kind == 'contains':
+                if not value:
+                    continue
+                matched = series.astype(str).str.contains(value, case=False, regex=False)
+            elif kind == 'equals':
+                matched = series == value
+            elif kind == 'in':
+                if not value:
+                    continue
+                matched = series.isin(value)
+            elif kind == 'range':
+                low, high = value
+                matched = pd.Series(True, index=series.index)
+                if low is not None:
+                    matched &= series >= low
+                if high is not None:
+                    matched &= series <= high
+            else:
+                raise ValueError(f"Unknown filter type: {kind}")
+            mask &= matched.fillna(False).to_numpy(dtype=bool)
+        return mask
+
+    def positions(self, sort=None, filters=None, rows=None):
+        """Row positions matching filters, in sort order (a (column, ascending) pair)
+
+        rows optionally restricts the result to a sequence of row positions,
+        e.g. search hits or a similarity ranking; without a sort they keep
+        the caller's order.
+        """
+        mask = self.filter_mask(filters) if filters else None
+        if sort is not None and sort[0] in self.df.columns:
+            if rows is not None:
+                restrict = np.zeros(len(self.df), dtype=bool)
+                restrict[rows] = True
+                mask = restrict if mask is None else mask & restrict
+            perm = self.sort_permutation(*sort)
+            return perm if mask is None else perm[mask[perm]]
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            return rows if mask is None else rows[mask[rows]]
+        if mask is None:
+            return np.arange(len(self.df))
+        return np.flatnonzero(mask)
+
+    def query(self, page=0, page_size=100, sort=None, filters=None, rows=None):
+        """(page frame, number of matching rows) for a zero-based page"""
+        positions = self.positions(sort, filters, rows)
+        start = page * page_size
+        return self.df.iloc[positions[start:start + page_size]], len(positions)
+
+    def group_counts(self, columns, filters=None, rows=None):
+        """Row counts per combination of columns, largest groups first
+
+        Counts cover the same rows as positions(filters=filters, rows=rows).
+        """
+        if filters or rows is not None:
+            df = self.df.iloc[self.positions(filters=filters, rows=rows)]
+        else:
+            df = self.df
+        counts = df.groupby(list(columns), observed=True, dropna=False).size()
+        return counts.sort_values(ascending=False).rename('count').reset_index()
+
+
+_engines = FrameCache(max_entries=GRID_ENGINE_CACHE_SIZE)
+
+
+def engine_for(df):
+    """Shared engine for df, so its sort permutations survive reruns"""
+    return _engines.get_or_build(df, lambda: GridQueryEngine(df))
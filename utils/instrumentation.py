@@ -0,0 +1,169 @@
+"""
+Lightweight per-stage instrumentation.
+
+Code marks a stage with ``with stage('name') as record:``; while a
+StageRecorder is active for the current context (one per script run),
+the stage's wall time, resident-memory delta and any fields put on the
+record (rows, bytes, ...) are collected. Every stage, recorded or not
+(e.g. one running on a download callback thread), is also folded into
+process-wide totals that render as Prometheus text format; without a
+recorder that costs a clock read and no memory probe. Records can be
+appended to a rolling JSON-lines log.
+"""
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import INSTRUMENTATION_LOG_BACKUPS, INSTRUMENTATION_LOG_MAX_BYTES
+
+_current = contextvars.ContextVar('stage_recorder', default=None)
+_totals = {}
+_totals_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where unavailable"""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageRecorder:
+    """Collects the stage records of one script run"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._depth = 0
+        self._token = None
+
+    def activate(self):
+        """Make this the recorder for stages in the current context"""
+        self._token = _current.set(self)
+        return self
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._token)
+
+    def total_seconds(self):
+        """Wall time of the top-level stages (nested ones are included in them)"""
+        return sum(record['seconds'] for record in self.records if record['depth'] == 0)
+
+
+@contextmanager
+def stage(name, **fields):
+    """Time the enclosed block as stage name; yields the (mutable) record"""
+    recorder = _current.get()
+    record = {'stage': name, **fields}
+    if recorder is None:
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            _add_to_totals(record)
+        return
+
+    record['run_id'] = recorder.run_id
+    record['depth'] = recorder._depth
+    record['started'] = time.time()
+    rss_before = current_rss()
+    start = time.perf_counter()
+    recorder._depth += 1
+    try:
+        yield record
+    finally:
+        recorder._depth -= 1
+        record['seconds'] = time.perf_counter() - start
+        rss_after = current_rss()
+        if rss_before is not None and rss_after is not None:
+            record['memory_delta_bytes'] = rss_after - rss_before
+        recorder.records.append(record)
+        _add_to_totals(record)
+
+
+def _add_to_totals(record):
+    with _totals_lock:
+        totals = _totals.setdefault(
+            record['stage'], {'count': 0, 'seconds': 0.0, 'network_seconds': 0.0, 'rows': 0, 'bytes': 0}
+        )
+        totals['count'] += 1
+        totals['seconds'] += record['seconds']
+        totals['network_seconds'] += record.get('network_seconds') or 0.0
+        totals['rows'] += record.get('rows') or 0
+        totals['bytes'] += record.get('bytes') or 0
+
+
+def append_jsonl(records, path, max_bytes=INSTRUMENTATION_LOG_MAX_BYTES,
+                 backups=INSTRUMENTATION_LOG_BACKUPS):
+    """Append records to a JSON-lines file, rotating it past max_bytes"""
+    with _log_lock:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            for i in range(backups - 1, 0, -1):
+                if os.path.exists(f"{path}.{i}"):
+                    os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+            os.replace(path, f"{path}.1")
+        with open(path, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + '\n')
+
+
+def prometheus_text():
+    """Process-wide stage totals in Prometheus text exposition format"""
+    with _totals_lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+    lines = []
+    metrics = [
+        ('disc_stage_runs_total', 'counter', 'Times the stage ran', 'count'),
+        ('disc_stage_seconds_total', 'counter', 'Wall time spent in the stage', 'seconds'),
+        ('disc_stage_network_seconds_total', 'counter',
+         'Part of the wall time spent waiting on the network', 'network_seconds'),
+        ('disc_stage_rows_total', 'counter', 'Rows processed by the stage', 'rows'),
+        ('disc_stage_bytes_total', 'counter', 'Bytes processed by the stage', 'bytes'),
+    ]
+    for metric, kind, help_text, key in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name in sorted(totals):
+            lines.append(f'{metric}{{stage="{name}"}} {totals[name][key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(path):
+    """Atomically rewrite path with prometheus_text(), e.g. for a textfile collector
+
+    Each call writes its own temporary file, so overlapping reruns never
+    replace each other's.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(prometheus_text())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
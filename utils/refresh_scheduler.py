@@ -0,0 +1,137 @@
+"""
+Background auto-refresh scheduler shared by all sessions.
+
+Sessions register the sources they display with watch(); a single daemon
+thread revalidates each distinct URL (and column projection) once per
+interval (the shortest one any watching session asked for) and bumps the
+source's version when the loaded frame changes. Sessions compare versions
+instead of sleeping.
+"""
+import threading
+import time
+
+from config import SCHEDULER_LEASE_INTERVALS
+from utils.data_loader import load_data_from_url
+
+
+class _Source:
+    def __init__(self, url, groups=None):
+        self.url = url
+        self.groups = groups
+        self.watchers = {}
+        self.version = 0
+        self.df = None
+        self.error = None
+        self.next_due = 0.0
+        self.last_refreshed = None
+
+    def interval(self):
+        return min(interval for interval, _ in self.watchers.values())
+
+
+class RefreshScheduler:
+    """Polls each watched source URL on one shared worker thread"""
+
+    def __init__(self, load=load_data_from_url, lease_intervals=SCHEDULER_LEASE_INTERVALS):
+        self._load = load
+        self.lease_intervals = lease_intervals
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def watch(self, url, interval, watcher_id, df=None, groups=None):
+        """Register or renew watcher_id's interest in url; return its current version.
+
+        Must be called at least once per interval to keep the lease. df is
+        the frame the session already holds, used as the baseline the
+        first refresh is compared against. groups is the column projection
+        the session loads url with (see load_data_from_url); each
+        projection is watched as its own source.
+        """
+        now = time.monotonic()
+        groups = tuple(groups) if groups is not None else None
+        with self._lock:
+            source = self._sources.get((url, groups))
+            if source is None:
+                source = self._sources[(url, groups)] = _Source(url, groups)
+                source.next_due = now + interval
+            if source.df is None:
+                source.df = df
+            source.watchers[watcher_id] = (interval, now + interval * self.lease_intervals)
+            source.next_due = min(source.next_due, now + interval)
+            version = source.version
+            self._ensure_worker()
+        self._wake.set()
+        return version
+
+    def unwatch(self, url, watcher_id, groups=None):
+        with self._lock:
+            source = self._sources.get((url, tuple(groups) if groups is not None else None))
+            if source is not None:
+                source.watchers.pop(watcher_id, None)
+
+    def status(self, url, groups=None):
+        """(version, last_refreshed wall time, last error) for url"""
+        with self._lock:
+            source = self._sources.get((url, tuple(groups) if groups is not None else None))
+            if source is None:
+                return 0, None, None
+            return source.version, source.last_refreshed, source.error
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+
+    def _due_sources(self, now):
+        """Expire stale leases and split sources into due ones and the next wake time"""
+        due = []
+        next_wake = None
+        for key in list(self._sources):
+            source = self._sources[key]
+            source.watchers = {
+                watcher: lease for watcher, lease in source.watchers.items() if lease[1] > now
+            }
+            if not source.watchers:
+                del self._sources[key]
+                continue
+            if source.next_due <= now:
+                due.append(source)
+            elif next_wake is None or source.next_due < next_wake:
+                next_wake = source.next_due
+        return due, next_wake
+
+    def _run(self):
+        while True:
+            with self._lock:
+                # Cleared under the lock so a watch() racing with this pass
+                # still wakes the wait below
+                self._wake.clear()
+                due, next_wake = self._due_sources(time.monotonic())
+                if not due and not self._sources:
+                    self._thread = None
+                    return
+
+            for source in due:
+                if source.groups is None:
+                    df, error = self._load(source.url, max_age=0)
+                else:
+                    df, error = self._load(source.url, max_age=0, groups=source.groups)
+                with self._lock:
+                    if df is not None and df is not source.df:
+                        source.df = df
+                        source.version += 1
+                    source.error = error
+                    source.last_refreshed = time.time()
+                    if source.watchers:
+                        source.next_due = time.monotonic() + source.interval()
+
+            if due:
+                continue
+            timeout = None if next_wake is None else max(0.0, next_wake - time.monotonic())
+            self._wake.wait(timeout)
+
+
+# Process-wide scheduler shared by every Streamlit session
+default_scheduler = RefreshScheduler()
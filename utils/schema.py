@@ -0,0 +1,104 @@
+"""
+Typed loading schema built from config.py.
+
+Low-cardinality columns are parsed straight into categoricals, dates into
+datetime64 and company ids into nullable integers, which keeps the
+per-session frame small and makes value_counts/nunique cheap.
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config import CATEGORICAL_COLUMNS, DATE_COLUMNS, INTEGER_COLUMNS
+
+SCHEMA_COLUMNS = set(CATEGORICAL_COLUMNS + DATE_COLUMNS + INTEGER_COLUMNS)
+
+
+def read_dtypes():
+    """dtype mapping to pass to pd.read_csv"""
+    # Absent columns are ignored by read_csv; dates and integers are
+    # converted afterwards so malformed cells become NaT/<NA> instead of
+    # failing the whole load
+    return {col: 'category' for col in CATEGORICAL_COLUMNS}
+
+
+def apply_schema(df):
+    """Coerce df to the loading schema in place and return it.
+
+    Date and integer cells that can't be parsed become NaT/<NA>; how many
+    non-empty cells each column lost that way is kept in
+    df.attrs['coerced_values'] (see coerced_values).
+    """
+    coerced = dict(df.attrs.get('coerced_values', {}))
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            # Sheets filled in by hand mix date formats; without 'mixed' the
+            # format is inferred from the first value and the rest are lost
+            parsed = pd.to_datetime(df[col], errors='coerce', format='mixed')
+            _count_coerced(coerced, col, df[col], parsed)
+            df[col] = parsed
+    for col in INTEGER_COLUMNS:
+        if col in df.columns and str(df[col].dtype) != 'Int64':
+            parsed = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+            _count_coerced(coerced, col, df[col], parsed)
+            df[col] = parsed
+    df.attrs['coerced_values'] = coerced
+    return df
+
+
+def _count_coerced(coerced, col, raw, parsed):
+    lost = int((parsed.isna() & raw.notna()).sum())
+    if lost:
+        coerced[col] = coerced.get(col, 0) + lost
+
+
+def coerced_values(df):
+    """{column: cells blanked because they couldn't be parsed} for df"""
+    return df.attrs.get('coerced_values', {})
+
+
+def concat_chunks(chunks):
+    """Concatenate parsed chunks without losing categorical dtypes.
+
+    Each chunk infers its own categories, and a plain pd.concat would
+    fall back to plain strings for any column whose categories differ. The
+    merged categories are sorted, so the result doesn't depend on chunk or
+    source order. Columns missing from some chunks are left to apply_schema.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if not all(col in chunk.columns for chunk in chunks):
+            continue
+        if all(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks):
+            df[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
+    return df
+
+
+def memory_report(df):
+    """Per-column memory of df versus the same data held as raw strings.
+
+    Returns a DataFrame with dtype, bytes before (object) and after
+    (current dtype), sorted by savings, plus a 'TOTAL' row.
+    """
+    rows = []
+    for col in df.columns:
+        after = int(df[col].memory_usage(deep=True, index=False))
+        if col not in SCHEMA_COLUMNS:
+            before = after
+        else:
+            as_text = df[col].astype(str).astype(object).mask(df[col].isna())
+            before = int(as_text.memory_usage(deep=True, index=False))
+        rows.append({'column': col, 'dtype': str(df[col].dtype), 'before_bytes': before, 'after_bytes': after})
+
+    report = pd.DataFrame(rows, columns=['column', 'dtype', 'before_bytes', 'after_bytes'])
+    report['saved_bytes'] = report['before_bytes'] - report['after_bytes']
+    report = report.sort_values('saved_bytes', ascending=False, ignore_index=True)
+    total = report[['before_bytes', 'after_bytes', 'saved_bytes']].sum()
+    report.loc[len(report)] = ['TOTAL', '', total['before_bytes'], total['after_bytes'], total['saved_bytes']]
+    return report
@@ -0,0 +1,168 @@
+"""
+Inverted index for token and prefix search over personnel records.
+
+Values are lower-cased and split into alphanumeric tokens. Each index
+segment stores a sorted vocabulary with the row positions of every token
+laid out contiguously, so a prefix lookup is two binary searches and one
+array slice. A query matches the rows containing every query term as a
+token prefix. Indexes are built per frame; when a refreshed sheet only
+gained rows at the end, just the new rows are indexed as an extra
+segment on top of the previous frame's segments.
+"""
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from config import SEARCH_COLUMNS, SEARCH_INDEX_CACHE_SIZE, SEARCH_MAX_SEGMENTS
+from utils.frame_cache import FrameCache
+
+TOKEN_PATTERN = r'[0-9a-z]+'
+
+
+def tokenize(text):
+    """Query terms, tokenized the same way as indexed values"""
+    return pd.Series([text]).str.lower().str.findall(TOKEN_PATTERN)[0]
+
+
+class _Segment:
+    """Sorted vocabulary plus postings for a block of rows"""
+
+    def __init__(self, vocab, offsets, postings):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, df, columns, row_offset=0):
+        value_tokens = []
+        row_values = []
+        for col in columns:
+            # Tokenize each distinct value once and fan out through the codes
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            tokens = pd.Series(uniques).astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+            if tokens.empty:
+                continue
+            value_tokens.append(pd.DataFrame({'col': col, 'code': tokens.index.to_numpy(), 'token': tokens.to_numpy(object)}))
+            present = codes >= 0
+            row_values.append(pd.DataFrame({'col': col, 'code': codes[present], 'row': np.flatnonzero(present)}))
+
+        if not value_tokens:
+            return cls(np.array([], dtype=object), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int64))
+
+        # Work on integer token ids ranked in vocabulary order, so sorting and
+        # de-duplicating the (token, row) pairs never compares strings
+        value_tokens = pd.concat(value_tokens, ignore_index=True)
+        token_ids, vocab = pd.factorize(value_tokens['token'])
+        vocab = np.asarray(vocab, dtype=object)
+        order = np.argsort(vocab, kind='stable')
+        rank = np.empty(len(vocab), dtype=np.int64)
+        rank[order] = np.arange(len(vocab))
+        value_tokens['rank'] = rank[token_ids]
+
+        pairs = pd.concat(row_values, ignore_index=True).merge(
+            value_tokens[['col', 'code', 'rank']], on=['col', 'code']
+        )
+        n_rows = max(len(df), 1)
+        keys = np.sort(pairs['rank'].to_numpy(np.int64) * n_rows + pairs['row'].to_numpy(np.int64))
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        ranks = keys // n_rows
+        starts = np.flatnonzero(np.r_[True, ranks[1:] != ranks[:-1]])
+        offsets = np.r_[starts, len(keys)].astype(np.int64)
+        return cls(vocab[order][ranks[starts]], offsets, keys % n_rows + row_offset)
+
+    def prefix_rows(self, term):
+        lo = np.searchsorted(self.vocab, term, side='left')
+        hi = np.searchsorted(self.vocab, term + '\U0010ffff', side='left')
+        return self.postings[self.offsets[lo]:self.offsets[hi]]
+
+    def nbytes(self):
+        vocab_bytes = int(pd.Series(self.vocab, dtype=object).memory_usage(deep=True, index=False))
+        return vocab_bytes + self.offsets.nbytes + self.postings.nbytes
+
+
+class SearchIndex:
+    """Prefix-searchable index over the SEARCH_COLUMNS of one frame.
+
+    An index never changes after it is built, so searches need no lock
+    and their positions always refer to index.df. Given the index of an
+    earlier frame of the same source, rows that frame already had are
+    not indexed again when df only gained rows at the end.
+    """
+
+    def __init__(self, df, previous=None, columns=SEARCH_COLUMNS, max_segments=SEARCH_MAX_SEGMENTS):
+        start = time.perf_counter()
+        columns = [col for col in columns if col in df.columns]
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy() if columns else None
+
+        old_rows = 0 if previous is None or previous._hashes is None else len(previous._hashes)
+        appended = (
+            previous is not None and columns == previous.columns and hashes is not None
+            and len(df) >= old_rows and np.array_equal(hashes[:old_rows], previous._hashes)
+        )
+        if appended:
+            mode = 'append'
+            segments = list(previous._segments)
+            if len(df) > old_rows:
+                segments.append(_Segment.build(df.iloc[old_rows:], columns, row_offset=old_rows))
+            if len(segments) > max_segments:
+                mode = 'merge'
+                segments = [_Segment.build(df, columns)]
+        else:
+            mode = 'full'
+            segments = [_Segment.build(df, columns)]
+
+        self.df = df
+        self.columns = columns
+        self._segments = segments
+        self._hashes = hashes
+        self.stats = {
+            'mode': mode,
+            'rows': len(df),
+            'new_rows': len(df) - old_rows if appended else len(df),
+            'segments': len(segments),
+            'tokens': sum(len(segment.vocab) for segment in segments),
+            'memory_bytes': sum(segment.nbytes() for segment in segments),
+            'build_seconds': time.perf_counter() - start
+        }
+
+    def search(self, query):
+        """Sorted positions in self.df of the rows matching every term of query as a prefix"""
+        n_rows = len(self.df)
+        matched = np.ones(n_rows, dtype=bool)
+        for term in tokenize(query):
+            # Boolean masks keep union and intersection linear, without sorting
+            term_rows = np.zeros(n_rows, dtype=bool)
+            for segment in self._segments:
+                term_rows[segment.prefix_rows(term)] = True
+            matched &= term_rows
+        return np.flatnonzero(matched)
+
+
+_indexes = FrameCache(max_entries=SEARCH_INDEX_CACHE_SIZE)
+# source key -> weak reference to the index last built for it, the base
+# for an append-only rebuild of that source's next frame
+_latest = {}
+_latest_lock = threading.Lock()
+
+
+def search_index_for(source_key, df):
+    """Shared index for df, reusing the last index of its source (e.g. its URL) when rows were appended.
+
+    Indexes are cached per frame, so sessions holding different frames of
+    one source (quarantined, deduplicated, ...) each search their own.
+    """
+    index = _indexes.get(df)
+    if index is not None:
+        return index
+    with _latest_lock:
+        ref = _latest.get(source_key)
+    index = SearchIndex(df, previous=ref() if ref is not None else None)
+    _indexes.put(df, index)
+    with _latest_lock:
+        for key in [key for key, ref in _latest.items() if ref() is None]:
+            del _latest[key]
+        _latest[source_key] = weakref.ref(index)
+    return index
@@ -0,0 +1,156 @@
+"""
+Nearest-neighbour lookup of behaviorally similar people.
+
+The DISC behavior columns are encoded once per dataset into a compact
+column x row matrix of small integer category codes (0 = missing). The
+similarity of two people is the share of the query person's known
+behaviors they have in common, so a top-k query is one vectorized
+equality pass per column; since match counts take only a handful of
+values, the top k are then picked by counting down from the highest
+count rather than by sorting. Batches of queries are matched as a
+(queries x rows) matrix, a cache-sized slice of rows at a time. Group queries score every row against the selected people's
+combined profile: a row earns, per column, the fraction of the group
+sharing its value.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    SIMILARITY_BATCH_COLUMNS, SIMILARITY_BATCH_ROWS, SIMILARITY_CACHE_SIZE, SIMILARITY_COLUMNS,
+    SIMILARITY_TOP_K
+)
+from utils.frame_cache import FrameCache
+
+
+def _codes(series):
+    """1-based category codes of series (0 for missing values) and their count"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        size = len(series.cat.categories)
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        size = len(uniques)
+    dtype = np.uint8 if size < 255 else np.uint16 if size < 65535 else np.uint32
+    return (codes + 1).astype(dtype), size + 1
+
+
+def _top_counts(matches, k, most=None):
+    """Positions of the k highest non-zero match counts, ties to the earlier row
+
+    most bounds the counts (the query's known behaviors); counts take only
+    a handful of values, so the cutoff is found by counting the rows at or
+    above each count from the top down rather than by sorting.
+    """
+    cutoff = 1
+    for count in range(int(matches.max(initial=0)) if most is None else most, 0, -1):
+        if np.count_nonzero(matches >= count) >= k:
+            cutoff = count
+            break
+    top = np.flatnonzero(matches >= cutoff)
+    # Stable, so rows tied at the cutoff stay in position order
+    return top[np.argsort(-matches[top].astype(np.int64), kind='stable')[:k]]
+
+
+class SimilarityIndex:
+    """Encoded behavior columns of one DataFrame"""
+
+    def __init__(self, df, columns=SIMILARITY_COLUMNS):
+        start = time.perf_counter()
+        self.df = df
+        self.columns = [col for col in columns if col in df.columns]
+        encoded = [_codes(df[col]) for col in self.columns]
+        self.cardinalities = [size for _, size in encoded]
+        dtype = np.result_type(*[codes.dtype for codes, _ in encoded]) if encoded else np.uint8
+        # One row per column, so each equality pass reads contiguous memory
+        self.codes = np.empty((len(self.columns), len(df)), dtype=dtype)
+        for i, (codes, _) in enumerate(encoded):
+            self.codes[i] = codes
+        self.build_seconds = time.perf_counter() - start
+
+    @property
+    def memory_bytes(self):
+        return self.codes.nbytes
+
+    def matches(self, position):
+        """Per row, how many of the person at position's known behaviors it shares"""
+        query = self.codes[:, position]
+        matches = np.zeros(self.codes.shape[1], dtype=np.uint8)
+        for i in np.flatnonzero(query):
+            matches += self.codes[i] == query[i]
+        return matches, int((query > 0).sum())
+
+    def top_k(self, position, k=SIMILARITY_TOP_K):
+        """(positions, scores in [0, 1]) of the k people most similar to position"""
+        matches, known = self.matches(position)
+        matches[position] = 0
+        top = _top_counts(matches, k, known) if known else np.zeros(0, dtype=np.int64)
+        return top, matches[top] / max(known, 1)
+
+    def batch_matches(self, positions):
+        """matches for each of positions at once: (len(positions) x rows counts, known)"""
+        positions = np.asarray(positions, dtype=np.int64)
+        query = self.codes[:, positions]
+        known = (query > 0).sum(axis=0)
+        # Missing query behaviors become a code no row has, so every column
+        # is compared without masking
+        query = np.where(query == 0, np.iinfo(self.codes.dtype).max, query)[:, :, None]
+        rows = self.codes.shape[1]
+        matches = np.zeros((len(positions), rows), dtype=np.uint8)
+        equal = np.empty((len(positions), min(SIMILARITY_BATCH_COLUMNS, rows)), dtype=bool)
+        for start in range(0, rows, SIMILARITY_BATCH_COLUMNS):
+            stop = min(start + SIMILARITY_BATCH_COLUMNS, rows)
+            block, block_equal = matches[:, start:stop], equal[:, :stop - start]
+            for i in range(len(self.columns)):
+                np.equal(self.codes[i, start:stop], query[i], out=block_equal)
+                block += block_equal
+        return matches, known
+
+    def top_k_batch(self, positions, k=SIMILARITY_TOP_K):
+        """top_k for each of positions: (len(positions) x k positions, scores)
+
+        Rows with fewer than k matches are padded with position -1 and
+        score 0.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        top = np.full((len(positions), k), -1, dtype=np.int64)
+        scores = np.zeros((len(positions), k))
+        for start in range(0, len(positions), SIMILARITY_BATCH_ROWS):
+            block = positions[start:start + SIMILARITY_BATCH_ROWS]
+            matches, known = self.batch_matches(block)
+            matches[np.arange(len(block)), block] = 0
+            for i in np.flatnonzero(known):
+                found = _top_counts(matches[i], k, int(known[i]))
+                top[start + i, :len(found)] = found
+                scores[start + i, :len(found)] = matches[i, found] / known[i]
+        return top, scores
+
+    def similar_to_group(self, positions, k=SIMILARITY_TOP_K):
+        """(positions, scores) of the k non-members most similar to the group as a whole"""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        scores = np.zeros(self.codes.shape[1])
+        columns = 0
+        for i, cardinality in enumerate(self.cardinalities):
+            counts = np.bincount(self.codes[i, positions], minlength=cardinality)
+            counts[0] = 0
+            if counts.sum() == 0:
+                continue
+            scores += (counts / counts.sum())[self.codes[i]]
+            columns += 1
+        scores /= max(columns, 1)
+        scores[positions] = 0
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return top, scores[top]
+
+
+_indexes = FrameCache(max_entries=SIMILARITY_CACHE_SIZE)
+
+
+def similarity_index_for(df):
+    """Shared SimilarityIndex for df, encoded once per dataset"""
+    return _indexes.get_or_build(df, lambda: SimilarityIndex(df))
@@ -0,0 +1,162 @@
+"""
+Persistent columnar snapshots of loaded sources.
+
+Every freshly parsed source is written as an Arrow IPC (Feather) file
+named after the URL and the content hash, with the HTTP validators in a
+JSON sidecar. After a restart the newest snapshot for a URL is read back
+(memory-mapped) and served while the source is revalidated. Snapshots
+need pyarrow; without it the store is disabled.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+
+from config import SNAPSHOT_DIR, SNAPSHOT_MAX_AGE_SECONDS, SNAPSHOT_MAX_BYTES, SNAPSHOT_STALE_TMP_SECONDS
+
+
+def _url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+
+class SnapshotStore:
+    """Directory of Feather snapshots, at most one per source URL"""
+
+    def __init__(self, directory=SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_BYTES,
+                 max_age=SNAPSHOT_MAX_AGE_SECONDS, stale_tmp_age=SNAPSHOT_STALE_TMP_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stale_tmp_age = stale_tmp_age
+        # pyarrow itself is only imported once a snapshot is read or written
+        self.enabled = importlib.util.find_spec('pyarrow') is not None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def _paths_for(self, url):
+        prefix = _url_key(url) + '-'
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name) for name in names
+            if name.startswith(prefix) and name.endswith('.feather')
+        ]
+
+    def load(self, url):
+        """Newest snapshot for url as (df, meta), or None"""
+        if not self.enabled:
+            return None
+        paths = self._paths_for(url)
+        if not paths:
+            return None
+        path = max(paths, key=os.path.getmtime)
+        from pyarrow import feather
+
+        try:
+            with open(path[:-len('.feather')] + '.json') as f:
+                meta = json.load(f)
+            df = feather.read_table(path, memory_map=True).to_pandas()
+        except (OSError, ValueError):
+            return None
+        return df, meta
+
+    def save(self, url, df, content_hash, etag=None, last_modified=None):
+        """Write df as the snapshot for url, replacing older ones, then prune"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        stem = os.path.join(self.directory, f"{_url_key(url)}-{content_hash[:32]}")
+        meta = {
+            'url': url,
+            'content_hash': content_hash,
+            'etag': etag,
+            'last_modified': last_modified,
+            'saved_at': time.time()
+        }
+        # Per-process temporary names, so a reader never sees a partial file
+        # and two processes never write the same one
+        tmp = f".{os.getpid()}.tmp"
+        with self._lock:
+            df.to_feather(stem + '.feather' + tmp)
+            with open(stem + '.json' + tmp, 'w') as f:
+                json.dump(meta, f)
+            os.replace(stem + '.json' + tmp, stem + '.json')
+            os.replace(stem + '.feather' + tmp, stem + '.feather')
+            for path in self._paths_for(url):
+                if path != stem + '.feather':
+                    self._remove(path)
+            self._prune()
+
+    def save_in_background(self, *args, **kwargs):
+        """save() on a worker thread.
+
+        The thread is not a daemon, so the interpreter finishes the write
+        before exiting instead of killing it halfway; wait() joins the
+        pending saves explicitly.
+        """
+        if not self.enabled:
+            return
+        thread = threading.Thread(target=self._save_tracked, args=args, kwargs=kwargs)
+        with self._pending_lock:
+            self._pending.add(thread)
+        thread.start()
+
+    def _save_tracked(self, *args, **kwargs):
+        try:
+            self.save(*args, **kwargs)
+        finally:
+            with self._pending_lock:
+                self._pending.discard(threading.current_thread())
+
+    def wait(self, timeout=None):
+        """Block until the background saves started so far have finished"""
+        with self._pending_lock:
+            pending = list(self._pending)
+        for thread in pending:
+            thread.join(timeout)
+
+    def _remove(self, path):
+        for victim in (path, path[:-len('.feather')] + '.json'):
+            try:
+                os.remove(victim)
+            except FileNotFoundError:
+                pass
+
+    def _prune(self):
+        """Drop stale temporary files and snapshots past max_age, then oldest first until under max_bytes"""
+        files = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if name.endswith('.tmp'):
+                # Left behind by a process killed mid-write; fresh ones may
+                # belong to a save still running in another process
+                if stat.st_mtime < now - self.stale_tmp_age:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            elif name.endswith('.feather'):
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        cutoff = now - self.max_age
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+
+# Process-wide store shared by every Streamlit session
+default_snapshots = SnapshotStore()
@@ -0,0 +1,125 @@
+"""
+Vectorized row-level validation.
+
+Each rule turns the (typed) frame into a boolean mask of violating rows
+using whole-column pandas operations, so no Python code runs per row.
+Reports are cached per dataset like the other per-frame engines; the
+quarantined (valid-only) frame is built once per report so downstream
+caches keyed on the frame keep hitting across reruns.
+
+Dates have already been coerced by utils.schema, so a missing and an
+unparsable date look the same here (NaT) and are reported together;
+utils.schema.coerced_values says how many were unparsable.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import EMAIL_PATTERN, VALID_DISC_PROFILES, VALIDATION_CACHE_SIZE
+from utils.frame_cache import FrameCache
+
+REQUIRED_COLUMNS = ['first_name', 'last_name', 'email', 'disc_profile']
+
+
+def _missing(df, column):
+    return df[column].isna()
+
+
+def _bad_email(df, column):
+    emails = df[column]
+    return emails.notna() & ~emails.astype('str').str.fullmatch(EMAIL_PATTERN).fillna(False).astype(bool)
+
+
+def _unknown_disc_profile(df, column):
+    profiles = df[column]
+    return profiles.notna() & ~profiles.isin(VALID_DISC_PROFILES)
+
+
+def _duplicate_email(df, column):
+    emails = df[column].astype('str').str.strip().str.lower()
+    return df[column].notna() & emails.duplicated(keep='first')
+
+
+def _future_date(df, column):
+    dates = pd.to_datetime(df[column], errors='coerce')
+    return dates > pd.Timestamp.now()
+
+
+RULES = [
+    *[
+        {'name': f'missing_{column}', 'column': column,
+         'description': f'{column} is empty', 'check': _missing}
+        for column in REQUIRED_COLUMNS
+    ],
+    {'name': 'malformed_email', 'column': 'email',
+     'description': 'email is not of the form name@domain.tld', 'check': _bad_email},
+    {'name': 'duplicate_email', 'column': 'email',
+     'description': 'email (case-insensitive) already used by an earlier row', 'check': _duplicate_email},
+    {'name': 'unknown_disc_profile', 'column': 'disc_profile',
+     'description': f"disc_profile is not one of {', '.join(VALID_DISC_PROFILES)}",
+     'check': _unknown_disc_profile},
+    {'name': 'invalid_assessment_date', 'column': 'assessment_date',
+     'description': 'assessment_date is missing or unparsable', 'check': _missing},
+    {'name': 'future_assessment_date', 'column': 'assessment_date',
+     'description': 'assessment_date lies in the future', 'check': _future_date},
+]
+
+
+class ValidationReport:
+    """Violations of every applicable rule for one DataFrame"""
+
+    def __init__(self, df, rules=None):
+        self.df = df
+        self.violations = {}
+        self.invalid_mask = np.zeros(len(df), dtype=bool)
+        self._rules = [rule for rule in (rules or RULES) if rule['column'] in df.columns]
+        self._valid_frame = None
+        self._lock = threading.Lock()
+        for rule in self._rules:
+            mask = np.asarray(rule['check'](df, rule['column']), dtype=bool)
+            self.violations[rule['name']] = np.flatnonzero(mask)
+            self.invalid_mask |= mask
+
+    @property
+    def invalid_rows(self):
+        return int(self.invalid_mask.sum())
+
+    def summary(self):
+        """One row per rule: column, description, violation count and share"""
+        rows = len(self.df)
+        return pd.DataFrame([
+            {
+                'rule': rule['name'],
+                'column': rule['column'],
+                'description': rule['description'],
+                'violations': len(self.violations[rule['name']]),
+                'percent': round(100 * len(self.violations[rule['name']]) / rows, 2) if rows else 0.0,
+            }
+            for rule in self._rules
+        ])
+
+    def offending_index(self, rule):
+        """Index labels of the rows violating rule"""
+        return self.df.index[self.violations[rule]]
+
+    def offending_rows(self, rule):
+        return self.df.iloc[self.violations[rule]]
+
+    def valid_frame(self):
+        """df without any violating row (the same object on every call)"""
+        with self._lock:
+            if self._valid_frame is None:
+                self._valid_frame = self.df if not self.invalid_mask.any() else self.df[~self.invalid_mask]
+            return self._valid_frame
+
+    def quarantined_frame(self):
+        return self.df[self.invalid_mask]
+
+
+_reports = FrameCache(max_entries=VALIDATION_CACHE_SIZE)
+
+
+def validate_rows(df):
+    """Shared validation report for df, computed once per dataset"""
+    return _reports.get_or_build(df, lambda: ValidationReport(df))